@@ -0,0 +1,64 @@
+# accounts/authentication.py
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import MyUser
+from .tokens import TOKEN_CLAIM_FIELDS, current_token_claims, token_claims
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that builds request.user from the token's claims (see
+    accounts/tokens.py) instead of querying the user table. The user is a MyUser instance
+    with only the claim fields loaded: it can be assigned to foreign keys and used in
+    filters, and any other field is loaded from the database when first read. Tokens
+    without the claims are authenticated from the database, as JWTAuthentication does.
+    Without a shared cache (CACHE_SHARED false), the claims are checked against the user
+    row, which becomes request.user.
+    """
+
+    def get_user(self, validated_token):
+        if any(field not in validated_token for field in TOKEN_CLAIM_FIELDS):
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        claims = {field: validated_token[field] for field in TOKEN_CLAIM_FIELDS}
+        user = None
+        if settings.CACHE_SHARED:
+            current = current_token_claims(user_id)
+        else:
+            user = MyUser._default_manager.filter(
+                **{api_settings.USER_ID_FIELD: user_id}
+            ).first()
+            current = token_claims(user) if user is not None else None
+        if current is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if current != claims:
+            raise AuthenticationFailed(
+                _("The user's account changed; log in again."), code="claims_changed"
+            )
+        if not claims["is_active"]:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if claims["is_locked"]:
+            raise AuthenticationFailed(_("Account is locked."), code="user_locked")
+
+        if user is not None:
+            return user
+
+        values = {api_settings.USER_ID_FIELD: user_id, **claims}
+        # from_db() takes the loaded values in model field order.
+        field_names = [
+            field.attname for field in MyUser._meta.concrete_fields if field.attname in values
+        ]
+        return MyUser.from_db(
+            DEFAULT_DB_ALIAS, field_names, [values[name] for name in field_names]
+        )
@@ -0,0 +1,61 @@
+# accounts/login.py
+#
+# Password login with account lockout. The user row is fetched once and the password is
+# checked on that instance, which is what ModelBackend.authenticate() does after fetching
+# the same row a second time. The failed-attempt counter is only changed with conditional
+# UPDATEs on F() expressions: the database increments and compares it, so parallel
+# attempts cannot lose increments or lock an account late, and only the two lockout
+# columns are written.
+
+from django.db.models import Case, F, Value, When
+
+from .models import MyUser
+from .tokens import forget_token_claims
+
+# Failed attempts in a row that lock the account.
+LOCKOUT_THRESHOLD = 5
+
+
+def fetch_login_user(username):
+    """Return the user logging in as `username`, or None."""
+    return MyUser._default_manager.filter(username=username).first()
+
+
+def check_login_password(user, password):
+    """True when there is a user, `password` is correct for it and the user is active."""
+    return user is not None and user.check_password(password) and user.is_active
+
+
+def record_failed_login(user):
+    """
+    Count a failed attempt, locking the account once it reaches LOCKOUT_THRESHOLD.
+    Returns False when the account was already locked.
+    """
+    updated = MyUser._default_manager.filter(pk=user.pk, is_locked=False).update(
+        failed_login_attempts=F("failed_login_attempts") + 1,
+        # Compared against the value before this UPDATE's increment.
+        is_locked=Case(
+            When(failed_login_attempts__gte=LOCKOUT_THRESHOLD - 1, then=Value(True)),
+            default=Value(False),
+        ),
+    )
+    if updated:
+        # This attempt may have locked the account (the UPDATE skipped post_save); only
+        # the database knows, as parallel attempts may have counted since the fetch.
+        forget_token_claims(user.pk)
+    return bool(updated)
+
+
+def record_successful_login(user):
+    """
+    Reset the failed-attempt counter. Returns False when the account was locked after it
+    was fetched (by parallel failed attempts or an admin), in which case login must fail.
+    """
+    if not user.failed_login_attempts:
+        # Nothing to reset, and the row was unlocked when fetched: skip the write.
+        return True
+    return bool(
+        MyUser._default_manager.filter(pk=user.pk, is_locked=False).update(
+            failed_login_attempts=0
+        )
+    )
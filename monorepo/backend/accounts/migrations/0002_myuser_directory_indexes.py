@@ -0,0 +1,46 @@
+# Generated by Django 5.1.6 on 2026-10-18 13:56
+
+from django.db import migrations, models
+
+# Columns the user directory prefix-searches with istartswith, which PostgreSQL runs as
+# UPPER(column::text) LIKE 'PREFIX%'. An index serves that only on the same expression
+# with text_pattern_ops (or with the C collation), which a model Index cannot declare
+# portably, so these are created here and only on PostgreSQL.
+PREFIX_SEARCH_COLUMNS = ('username', 'email', 'net_id', 'last_name')
+
+
+def create_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for column in PREFIX_SEARCH_COLUMNS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS myuser_{column}_prefix ON accounts_myuser '
+            f'(UPPER("{column}"::text) text_pattern_ops)'
+        )
+
+
+def drop_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for column in PREFIX_SEARCH_COLUMNS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS myuser_{column}_prefix')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='myuser',
+            index=models.Index(fields=['role', 'username'], name='myuser_role_username'),
+        ),
+        migrations.AddIndex(
+            model_name='myuser',
+            index=models.Index(condition=models.Q(('is_locked', True)), fields=['username'], name='myuser_locked_username'),
+        ),
+        migrations.RunPython(create_prefix_indexes, drop_prefix_indexes),
+    ]
@@ -33,7 +33,18 @@ class MyUser(AbstractUser):
     requested_role = models.CharField(max_length=20, choices=ROLE_CHOICES, blank=True, null=True,)
     # Whether the requested role has been approved
     role_approved = models.BooleanField(default=False)
-    
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Directory filters, in the UserCursorPagination order. Prefix-search indexes
+            # are created by migration 0002 on PostgreSQL.
+            models.Index(fields=["role", "username"], name="myuser_role_username"),
+            models.Index(
+                fields=["username"], condition=models.Q(is_locked=True),
+                name="myuser_locked_username",
+            ),
+        ]
+
     def __str__(self):
         return self.username
 
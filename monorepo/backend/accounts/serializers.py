@@ -1,7 +1,17 @@
 
 
 from rest_framework import serializers
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 from .models import MyUser, Scholarship, UserChangeHistory
+from .tokens import ClaimsRefreshToken, token_claims
+
+# Columns loaded and returned by the user directory (UserListView).
+USER_DIRECTORY_FIELDS = [
+    'id', 'username', 'email', 'first_name', 'last_name', 'net_id',
+    'role', 'role_approved', 'is_locked',
+]
 
 class MyUserSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=8, required=True)
@@ -28,6 +38,14 @@ class MyUserSerializer(serializers.ModelSerializer):
         user.save()
         return user
 
+class UserDirectorySerializer(serializers.ModelSerializer):
+    """The columns the user directory lists; see USER_DIRECTORY_FIELDS."""
+
+    class Meta:
+        model = MyUser
+        fields = USER_DIRECTORY_FIELDS
+        read_only_fields = fields
+
 class ScholarshipSerializer(serializers.ModelSerializer):
     class Meta:
         model = Scholarship
@@ -61,4 +79,27 @@ class UserUpdateSerializer(serializers.ModelSerializer):
                     new_value=new_value,
                     changed_by=changed_by
                 )
-        return super().update(instance, validated_data)
\ No newline at end of file
+        return super().update(instance, validated_data)
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = ClaimsRefreshToken
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refreshes a token with the user's current claims rather than the ones it was issued
+    with, so a role or lock change reaches the next access token.
+    """
+    token_class = ClaimsRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        user = MyUser.objects.filter(
+            pk=refresh.payload.get(api_settings.USER_ID_CLAIM)
+        ).first()
+        if user is None:
+            raise AuthenticationFailed(
+                self.error_messages["no_active_account"], "no_active_account"
+            )
+        refresh.payload.update(token_claims(user))
+        return super().validate({"refresh": str(refresh)})
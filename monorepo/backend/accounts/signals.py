@@ -0,0 +1,32 @@
+# accounts/signals.py
+
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .models import MyUser
+from .tokens import TOKEN_CLAIM_FIELDS, forget_token_claims
+
+
+def _token_claim_state(instance):
+    # Read from __dict__ so deferred fields are not loaded.
+    return tuple(instance.__dict__.get(field) for field in TOKEN_CLAIM_FIELDS)
+
+
+@receiver(post_init, sender=MyUser)
+def remember_token_claim_state(sender, instance, **kwargs):
+    instance._token_claim_state = _token_claim_state(instance)
+
+
+@receiver(post_save, sender=MyUser)
+def token_claims_changed(sender, instance, created, **kwargs):
+    """Reject tokens issued before a change to the user's role, status or lock."""
+    state = _token_claim_state(instance)
+    if not created and state != getattr(instance, '_token_claim_state', None):
+        forget_token_claims(instance.pk)
+    instance._token_claim_state = state
+
+
+@receiver(post_delete, sender=MyUser)
+def user_deleted(sender, instance, **kwargs):
+    """Reject the deleted user's tokens."""
+    forget_token_claims(instance.pk)
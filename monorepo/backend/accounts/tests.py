@@ -1,6 +1,15 @@
+from django.core.cache import cache
+from django.test import override_settings
 from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework.test import APITestCase
 from rest_framework import status
+from .login import (
+    LOCKOUT_THRESHOLD,
+    fetch_login_user,
+    record_failed_login,
+    record_successful_login,
+)
 from .models import MyUser
 
 class AccountsTestCase(APITestCase):
@@ -105,4 +114,236 @@ class AccountsTestCase(APITestCase):
         response = self.client.post(url, data, format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.normal_user.refresh_from_db()
-        self.assertTrue(self.normal_user.check_password('changedpass123'))
\ No newline at end of file
+        self.assertTrue(self.normal_user.check_password('changedpass123'))
+
+class LoginLockoutTestCase(APITestCase):
+    def setUp(self):
+        self.user = MyUser.objects.create_user(
+            username='student', password='rightpass', email='student@example.com'
+        )
+        self.url = reverse('login')
+
+    def _login(self, password):
+        return self.client.post(
+            self.url, {'username': 'student', 'password': password}, format='json'
+        )
+
+    def test_locks_after_threshold(self):
+        for _ in range(LOCKOUT_THRESHOLD):
+            self.assertEqual(self._login('wrong').status_code, status.HTTP_400_BAD_REQUEST)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_locked)
+        self.assertEqual(self.user.failed_login_attempts, LOCKOUT_THRESHOLD)
+        self.assertEqual(self._login('rightpass').status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_success_resets_counter(self):
+        self._login('wrong')
+        self._login('wrong')
+        self.assertEqual(self._login('rightpass').status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.failed_login_attempts, 0)
+
+    def test_single_user_fetch(self):
+        # One SELECT of the user, no UPDATE while there is nothing to reset.
+        with self.assertNumQueries(1):
+            self.assertEqual(self._login('rightpass').status_code, status.HTTP_200_OK)
+        # A failure is one SELECT and one UPDATE.
+        with self.assertNumQueries(2):
+            self._login('wrong')
+
+    def test_stale_fetch_does_not_lose_increments(self):
+        # Attempts that read the row before each other's writes still all count.
+        stale = fetch_login_user('student')
+        for _ in range(LOCKOUT_THRESHOLD - 1):
+            record_failed_login(stale)
+        self.assertTrue(record_failed_login(stale))
+        self.assertFalse(record_failed_login(stale))
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_locked)
+        self.assertEqual(self.user.failed_login_attempts, LOCKOUT_THRESHOLD)
+
+    def test_lock_after_fetch_blocks_login(self):
+        stale = fetch_login_user('student')
+        stale.failed_login_attempts = 1
+        MyUser.objects.filter(pk=self.user.pk).update(is_locked=True)
+        self.assertFalse(record_successful_login(stale))
+
+
+class ClaimsJWTAuthenticationTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = MyUser.objects.create_superuser(
+            username='admin', password='adminpass', email='admin@example.com'
+        )
+        self.user = MyUser.objects.create_user(
+            username='student', password='rightpass', email='student@example.com'
+        )
+
+    def _login(self, username='student', password='rightpass'):
+        response = self.client.post(
+            reverse('login'), {'username': username, 'password': password}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def _get(self, url, access):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        response = self.client.get(url)
+        self.client.credentials()
+        return response
+
+    def _assert_rejected(self, access, code='claims_changed'):
+        response = self._get(reverse('current_user'), access)
+        # 403 rather than 401, as SessionAuthentication comes first.
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response.data['detail'].code, code)
+
+    def test_no_user_query(self):
+        url = reverse('document_list')
+        plain = str(AccessToken.for_user(self.user))
+        with self.assertNumQueries(2):
+            # The user row, then the documents.
+            self.assertEqual(self._get(url, plain).status_code, status.HTTP_200_OK)
+        access = self._login()['access']
+        with self.assertNumQueries(1):
+            self.assertEqual(self._get(url, access).status_code, status.HTTP_200_OK)
+
+    def test_cache_miss_checks_database(self):
+        access = self._login()['access']
+        url = reverse('document_list')
+        cache.clear()
+        with self.assertNumQueries(2):
+            # The claims, then the documents.
+            self.assertEqual(self._get(url, access).status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(1):
+            self.assertEqual(self._get(url, access).status_code, status.HTTP_200_OK)
+        # An update that skips post_save is seen once the cached claims are gone.
+        MyUser.objects.filter(pk=self.user.pk).update(role='reviewer')
+        cache.clear()
+        self._assert_rejected(access)
+
+    def test_deleted_user_rejected(self):
+        access = self._login()['access']
+        self.user.delete()
+        self._assert_rejected(access, code='user_not_found')
+
+    @override_settings(CACHE_SHARED=False)
+    def test_unshared_cache_checks_database(self):
+        access = self._login()['access']
+        url = reverse('document_list')
+        with self.assertNumQueries(2):
+            # The user row, then the documents.
+            self.assertEqual(self._get(url, access).status_code, status.HTTP_200_OK)
+        MyUser.objects.filter(pk=self.user.pk).update(is_locked=True)
+        self._assert_rejected(access)
+
+    def test_user_from_claims(self):
+        access = self._login()['access']
+        response = self._get(reverse('current_user'), access)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['email'], 'student@example.com')
+
+    def test_role_change_rejects_old_tokens(self):
+        access = self._login()['access']
+        self.user.role = 'reviewer'
+        self.user.save()
+        self._assert_rejected(access)
+        # A new login carries the new role.
+        access = self._login()['access']
+        self.assertEqual(self._get(reverse('current_user'), access).status_code, status.HTTP_200_OK)
+
+    def test_admin_lock_rejects_tokens(self):
+        access = self._login()['access']
+        self.client.force_authenticate(self.admin)
+        self.client.post(reverse('lock_account', kwargs={'user_id': self.user.id}))
+        self.client.force_authenticate(None)
+        self._assert_rejected(access)
+
+    def test_lockout_rejects_tokens(self):
+        access = self._login()['access']
+        for _ in range(LOCKOUT_THRESHOLD):
+            self.client.post(
+                reverse('login'), {'username': 'student', 'password': 'wrong'}, format='json'
+            )
+        self._assert_rejected(access)
+
+    def test_stale_fetch_lockout_rejects_tokens(self):
+        access = self._login()['access']
+        # Fetched before parallel attempts brought the counter to one short of the lock.
+        stale = fetch_login_user('student')
+        MyUser.objects.filter(pk=self.user.pk).update(
+            failed_login_attempts=LOCKOUT_THRESHOLD - 1
+        )
+        self.assertTrue(record_failed_login(stale))
+        self._assert_rejected(access)
+
+    def test_refresh_uses_current_claims(self):
+        tokens = self._login()
+        self.user.role_approved = True
+        self.user.save()
+        response = self.client.post(
+            reverse('token_refresh'), {'refresh': tokens['refresh']}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(AccessToken(response.data['access'])['role_approved'])
+        self.assertEqual(
+            self._get(reverse('current_user'), response.data['access']).status_code,
+            status.HTTP_200_OK,
+        )
+
+
+class UserDirectoryTestCase(APITestCase):
+    def setUp(self):
+        self.admin = MyUser.objects.create_superuser(
+            username='admin', password='adminpass', email='admin@example.com', role='admin'
+        )
+        for i, last_name in enumerate(['Smith', 'Smythe', 'Jones', 'Smalls']):
+            MyUser.objects.create_user(
+                username=f'student{i}', password='pass', email=f'student{i}@example.com',
+                last_name=last_name, net_id=f'net{i}', security_answer1='secret',
+            )
+        MyUser.objects.filter(username='student3').update(is_locked=True)
+        self.client.force_authenticate(self.admin)
+        self.url = reverse('user-list')
+
+    def _usernames(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = response.data['results'] if 'results' in response.data else response.data
+        return [row['username'] for row in rows]
+
+    def test_admin_only(self):
+        self.client.force_authenticate(MyUser.objects.get(username='student0'))
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_slim_projection(self):
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.data), 5)
+        self.assertNotIn('security_answer1', response.data[0])
+        self.assertNotIn('password', response.data[0])
+
+    def test_prefix_search(self):
+        self.assertEqual(self._usernames(search='sm'), ['student0', 'student1', 'student3'])
+        self.assertEqual(self._usernames(search='SMY'), ['student1'])
+        self.assertEqual(self._usernames(search='net2'), ['student2'])
+        self.assertEqual(self._usernames(search='admin@'), ['admin'])
+        # Prefix, not substring.
+        self.assertEqual(self._usernames(search='mith'), [])
+
+    def test_role_and_lock_filters(self):
+        self.assertEqual(self._usernames(role='admin'), ['admin'])
+        self.assertEqual(self._usernames(is_locked='true'), ['student3'])
+        self.assertEqual(len(self._usernames(is_locked='false')), 4)
+
+    def test_keyset_pagination(self):
+        response = self.client.get(self.url, {'page_size': 2})
+        self.assertEqual(
+            [row['username'] for row in response.data['results']], ['admin', 'student0']
+        )
+        with self.assertNumQueries(1):
+            response = self.client.get(response.data['next'])
+        self.assertEqual(
+            [row['username'] for row in response.data['results']], ['student1', 'student2']
+        )
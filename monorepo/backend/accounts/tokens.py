@@ -0,0 +1,72 @@
+# accounts/tokens.py
+#
+# JWTs that carry the user's identity and role as signed claims, so ClaimsJWTAuthentication
+# can authenticate a request without loading the user row. A claim goes stale when the
+# user changes after the token was issued, so every request compares the token's claims
+# with the user's current ones, which are cached per user for CLAIMS_CACHE_TIMEOUT
+# seconds. Saving or deleting a user, or locking it on failed logins, deletes the entry,
+# and a cache miss re-reads the claims from the database: a deleted user has none, and
+# its tokens are rejected. Updates that skip the model's signals (QuerySet.update())
+# are seen once the entry expires.
+#
+# Deleting an entry only reaches other processes through a shared cache; with a
+# per-process one (CACHE_SHARED false), ClaimsJWTAuthentication reads the user row on
+# every request instead.
+
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import MyUser
+
+# User fields embedded in tokens, besides the user ID.
+TOKEN_CLAIM_FIELDS = (
+    "username", "role", "role_approved", "is_staff", "is_superuser", "is_active", "is_locked",
+)
+
+CLAIMS_CACHE_KEY = "accounts:token-claims:{}"
+CLAIMS_CACHE_TIMEOUT = 60
+
+
+def token_claims(user):
+    """The claims a token issued to `user` now would carry."""
+    return {field: getattr(user, field) for field in TOKEN_CLAIM_FIELDS}
+
+
+def cache_token_claims(user_id, claims):
+    """Cache a user's current claims, unless a request already has."""
+    cache.add(CLAIMS_CACHE_KEY.format(user_id), claims, CLAIMS_CACHE_TIMEOUT)
+
+
+def forget_token_claims(user_id):
+    """Drop a user's cached claims after a change, so the next request re-reads them."""
+    key = CLAIMS_CACHE_KEY.format(user_id)
+    cache.delete(key)
+    # Again on commit in case a request cached the pre-commit row meanwhile.
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def current_token_claims(user_id):
+    """A user's current claims, from the cache or else the database; None if no user."""
+    claims = cache.get(CLAIMS_CACHE_KEY.format(user_id))
+    if claims is None:
+        claims = MyUser._default_manager.filter(
+            **{api_settings.USER_ID_FIELD: user_id}
+        ).values(*TOKEN_CLAIM_FIELDS).first()
+        if claims is not None:
+            cache_token_claims(user_id, claims)
+    return claims
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """A refresh token whose claims are copied into the access tokens made from it."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        claims = token_claims(user)
+        token.payload.update(claims)
+        # The caller just read the user row: spare the first request a lookup.
+        cache_token_claims(user.pk, claims)
+        return token
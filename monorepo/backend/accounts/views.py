@@ -1,21 +1,32 @@
 import logging
-from django.contrib.auth import authenticate
 from django.http import Http404
 from django.db import transaction
+from django.db.models import Q
 from rest_framework import generics, status, permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.exceptions import PermissionDenied
-from rest_framework_simplejwt.tokens import RefreshToken
-
+from mybackend.db_routers import ReplicaReadMixin
+
+from .login import (
+    LOCKOUT_THRESHOLD,
+    check_login_password,
+    fetch_login_user,
+    record_failed_login,
+    record_successful_login,
+)
 from .models import MyUser, Scholarship, UserChangeHistory
+from .tokens import ClaimsRefreshToken
 from .serializers import (
     MyUserSerializer,
     ScholarshipSerializer,
     UserUpdateSerializer,
     UserChangeHistorySerializer,
+    UserDirectorySerializer,
+    USER_DIRECTORY_FIELDS,
 )
+from .pagination import UserCursorPagination
 
 logger = logging.getLogger(__name__)
 
@@ -35,19 +46,13 @@ class LoginView(APIView):
         if not username or not password:
             return Response({'error': 'Username and password are required'},
                             status=status.HTTP_400_BAD_REQUEST)
-        try:
-            user = MyUser.objects.get(username=username)
-        except MyUser.DoesNotExist:
-            return Response({'error': 'Invalid credentials'},
-                            status=status.HTTP_400_BAD_REQUEST)
-        if user.is_locked:
-            return Response({'error': 'Account is locked due to too many failed login attempts.'},
-                            status=status.HTTP_403_FORBIDDEN)
-        user_auth = authenticate(username=username, password=password)
-        if user_auth is not None and user_auth.is_active:
-            user.failed_login_attempts = 0
-            user.save()
-            refresh = RefreshToken.for_user(user)
+        user = fetch_login_user(username)
+        if user is not None and user.is_locked:
+            return self._locked()
+        if check_login_password(user, password):
+            if not record_successful_login(user):
+                return self._locked()
+            refresh = ClaimsRefreshToken.for_user(user)
             return Response({
                 'message': 'Login successful',
                 'refresh': str(refresh),
@@ -55,13 +60,14 @@ class LoginView(APIView):
                 'role': user.role,
                 'role_approved': user.role_approved,
             })
-        else:
-            user.failed_login_attempts += 1
-            if user.failed_login_attempts >= 5:
-                user.is_locked = True
-            user.save()
-            return Response({'error': 'Invalid credentials'},
-                            status=status.HTTP_400_BAD_REQUEST)
+        if user is not None and not record_failed_login(user):
+            return self._locked()
+        return Response({'error': 'Invalid credentials'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    def _locked(self):
+        return Response({'error': 'Account is locked due to too many failed login attempts.'},
+                        status=status.HTTP_403_FORBIDDEN)
 
 # Admin-only endpoint: Unlock a user account.
 class UnlockAccountView(APIView):
@@ -89,7 +95,7 @@ class LockAccountView(APIView):
             return Response({'error': 'User not found'},
                             status=status.HTTP_404_NOT_FOUND)
         user.is_locked = True
-        user.failed_login_attempts = 5  # Set to threshold
+        user.failed_login_attempts = LOCKOUT_THRESHOLD
         user.save()
         return Response({'message': 'User account has been locked.'})
 
@@ -106,7 +112,7 @@ class SetPasswordView(APIView):
                                 status=status.HTTP_400_BAD_REQUEST)
             user = request.user
             user.set_password(password)
-            user.save()
+            user.save(update_fields=['password'])
             logger.info(f"User {user.username} set password successfully.")
             return Response({"message": "Password set successfully."},
                             status=status.HTTP_200_OK)
@@ -129,7 +135,7 @@ class ChangePasswordView(APIView):
                 return Response({"error": "Current password is incorrect."},
                                 status=status.HTTP_400_BAD_REQUEST)
             user.set_password(new_password)
-            user.save()
+            user.save(update_fields=['password'])
             logger.info(f"User {user.username} changed password successfully.")
             return Response({"message": "Password updated successfully."},
                             status=status.HTTP_200_OK)
@@ -172,7 +178,7 @@ class UserUpdateView(generics.UpdateAPIView):
     def update(self, request, *args, **kwargs):
         return super().update(request, *args, **kwargs)
 
-class UserChangeHistoryView(generics.ListAPIView):
+class UserChangeHistoryView(ReplicaReadMixin, generics.ListAPIView):
     serializer_class = UserChangeHistorySerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -180,11 +186,37 @@ class UserChangeHistoryView(generics.ListAPIView):
         user_id = self.kwargs["pk"]
         return UserChangeHistory.objects.filter(user__id=user_id).order_by("-timestamp")
 
-class UserListView(APIView):
-    def get(self, request):
-        users = MyUser.objects.all()
-        serializer = MyUserSerializer(users, many=True)
-        return Response(serializer.data)
+class UserListView(ReplicaReadMixin, generics.ListAPIView):
+    """
+    User directory for admins, ordered by username, loading only the listed columns.
+    Query parameters, all optional:
+      search     prefix of a username, email, NetID or last name (case-insensitive)
+      role       one of MyUser.ROLE_CHOICES
+      is_locked  true or false
+    Paginated with ?page_size= / ?cursor= (see UserCursorPagination).
+    """
+    serializer_class = UserDirectorySerializer
+    permission_classes = [IsAdminUser]
+    pagination_class = UserCursorPagination
+
+    def get_queryset(self):
+        users = MyUser.objects.only(*USER_DIRECTORY_FIELDS).order_by('username')
+        params = self.request.query_params
+        search = params.get('search', '').strip()
+        if search:
+            users = users.filter(
+                Q(username__istartswith=search)
+                | Q(email__istartswith=search)
+                | Q(net_id__istartswith=search)
+                | Q(last_name__istartswith=search)
+            )
+        role = params.get('role')
+        if role:
+            users = users.filter(role=role)
+        is_locked = params.get('is_locked')
+        if is_locked is not None:
+            users = users.filter(is_locked=is_locked.lower() in ('true', '1'))
+        return users
 
 # Modified UserDetailView to allow DELETE.
 class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -217,5 +249,6 @@ def current_user(request):
     """
     Returns the currently authenticated user's details.
     """
-    serializer = MyUserSerializer(request.user)
+    # A token-authenticated request.user only has the token's claims loaded.
+    serializer = MyUserSerializer(MyUser.objects.get(pk=request.user.pk))
     return Response(serializer.data)
\ No newline at end of file
@@ -0,0 +1,236 @@
+# monorepo/backend/applications/allocation.py
+#
+# Award allocation. Each unawarded application is a candidate award for the scholarship
+# it applied to, worth its stored MatchResult score. Choosing the awards is a min-cost
+# flow problem:
+#
+#   source -> scholarship (capacity: awards left) -> applicant (cost: score) -> sink (1)
+#
+# so no scholarship exceeds its quantity and no applicant is awarded twice, and the flow
+# of greatest total score is the best assignment. It is solved with the primal-dual
+# method: one Dijkstra pass per distinct augmenting-path cost, then a blocking flow over
+# the zero-reduced-cost edges, rather than one shortest path per award.
+
+import heapq
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from scholarships.models import Scholarship
+from .models import AllocationLock, Application, MatchResult
+from .signals import applications_awarded
+
+# Scores are scaled to integers for the solver, so reduced costs compare exactly.
+SCORE_SCALE = 1000
+
+
+class MinCostFlow:
+    """
+    Min-cost flow over a graph with non-negative edge costs. Edges are stored in flat
+    lists, with each edge's residual twin at index ^ 1.
+    """
+
+    def __init__(self, node_count):
+        self.adjacency = [[] for _ in range(node_count)]
+        self.to = []
+        self.capacity = []
+        self.cost = []
+
+    def add_edge(self, u, v, capacity, cost):
+        """Add an edge and return its index; its flow is later self.flow_on(index)."""
+        index = len(self.to)
+        self.adjacency[u].append(index)
+        self.adjacency[v].append(index + 1)
+        self.to += [v, u]
+        self.capacity += [capacity, 0]
+        self.cost += [cost, -cost]
+        return index
+
+    def flow_on(self, edge):
+        return self.capacity[edge ^ 1]
+
+    def _dijkstra(self, source, potential):
+        distance = [None] * len(self.adjacency)
+        distance[source] = 0
+        heap = [(0, source)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > distance[u]:
+                continue
+            for edge in self.adjacency[u]:
+                if not self.capacity[edge]:
+                    continue
+                v = self.to[edge]
+                nd = d + self.cost[edge] + potential[u] - potential[v]
+                if distance[v] is None or nd < distance[v]:
+                    distance[v] = nd
+                    heapq.heappush(heap, (nd, v))
+        return distance
+
+    def _blocking_flow(self, source, sink, potential):
+        """Saturate the admissible (zero reduced cost) edges, Dinic-style."""
+        def admissible(u, edge):
+            v = self.to[edge]
+            return self.capacity[edge] and self.cost[edge] + potential[u] - potential[v] == 0
+
+        pushed = 0
+        while True:
+            level = [None] * len(self.adjacency)
+            level[source] = 0
+            queue = [source]
+            for u in queue:
+                for edge in self.adjacency[u]:
+                    v = self.to[edge]
+                    if level[v] is None and admissible(u, edge):
+                        level[v] = level[u] + 1
+                        queue.append(v)
+            if level[sink] is None:
+                return pushed
+            next_edge = [0] * len(self.adjacency)
+            while True:
+                # Iterative DFS for one augmenting path along increasing levels.
+                path = []
+                u = source
+                while u != sink:
+                    edges = self.adjacency[u]
+                    while next_edge[u] < len(edges):
+                        edge = edges[next_edge[u]]
+                        v = self.to[edge]
+                        if level[v] == level[u] + 1 and admissible(u, edge):
+                            break
+                        next_edge[u] += 1
+                    else:
+                        if not path:
+                            break
+                        # Dead end: retreat and skip the edge that led here.
+                        level[u] = None
+                        edge = path.pop()
+                        u = self.to[edge ^ 1]
+                        next_edge[u] += 1
+                        continue
+                    path.append(edge)
+                    u = v
+                if u != sink:
+                    break
+                amount = min(self.capacity[edge] for edge in path)
+                for edge in path:
+                    self.capacity[edge] -= amount
+                    self.capacity[edge ^ 1] += amount
+                pushed += amount
+
+    def run(self, source, sink, max_path_cost):
+        """
+        Push flow along shortest augmenting paths while a path costs less than
+        max_path_cost. Returns the total flow.
+        """
+        potential = [0] * len(self.adjacency)
+        total = 0
+        while True:
+            distance = self._dijkstra(source, potential)
+            if distance[sink] is None:
+                return total
+            for node, d in enumerate(distance):
+                if d is not None:
+                    potential[node] += d
+            if potential[sink] - potential[source] >= max_path_cost:
+                return total
+            total += self._blocking_flow(source, sink, potential)
+
+
+def _remaining_quantities(scholarships):
+    """{scholarship_id: awards still available}; a scholarship without a quantity has one."""
+    rows = scholarships.order_by().annotate(
+        awarded_count=Count("application", filter=Q(application__awarded=True))
+    ).values_list("id", "quantity", "awarded_count")
+    return {
+        scholarship_id: max(0, (quantity if quantity is not None else 1) - awarded_count)
+        for scholarship_id, quantity, awarded_count in rows
+    }
+
+
+def compute_awards(scholarships, min_score=1):
+    """
+    Compute the awards that maximize the total match score. Candidates are unawarded
+    applications whose MatchResult for the scholarship they applied to scores at least
+    min_score, from applicants with no award yet. Returns a list of
+    {"application_id", "applicant_id", "scholarship_id", "score"} dicts.
+    """
+    remaining = {
+        scholarship_id: quantity
+        for scholarship_id, quantity in _remaining_quantities(scholarships).items()
+        if quantity > 0
+    }
+    already_awarded = Application.objects.filter(awarded=True).values("applicant_id")
+    candidates = MatchResult.objects.filter(
+        application__scholarship_id=F("scholarship_id"),
+        application__awarded=False,
+        scholarship_id__in=list(remaining),
+        score__gte=min_score,
+    ).exclude(application__applicant_id__in=already_awarded).order_by(
+        "application_id"
+    ).values_list("application_id", "application__applicant_id", "scholarship_id", "score")
+
+    # An applicant's best application per scholarship is the only one worth awarding.
+    best = {}
+    for application_id, applicant_id, scholarship_id, score in candidates:
+        key = (scholarship_id, applicant_id)
+        if key not in best or score > best[key][1]:
+            best[key] = (application_id, score)
+    if not best:
+        return []
+
+    scholarship_nodes = {sid: i for i, sid in enumerate(sorted({s for s, _ in best}))}
+    applicant_ids = sorted({a for _, a in best})
+    applicant_nodes = {
+        aid: len(scholarship_nodes) + i for i, aid in enumerate(applicant_ids)
+    }
+    source = len(scholarship_nodes) + len(applicant_nodes)
+    sink = source + 1
+    # Costs must be non-negative, so each award costs (top score - score); every
+    # augmenting path gains exactly one award, so it improves the total only while it
+    # costs less than the top score.
+    top_score = round(max(score for _, score in best.values()) * SCORE_SCALE)
+    graph = MinCostFlow(sink + 1)
+    for scholarship_id, node in scholarship_nodes.items():
+        graph.add_edge(source, node, remaining[scholarship_id], 0)
+    for applicant_id, node in applicant_nodes.items():
+        graph.add_edge(node, sink, 1, 0)
+    award_edges = {}
+    for (scholarship_id, applicant_id), (application_id, score) in sorted(best.items()):
+        edge = graph.add_edge(
+            scholarship_nodes[scholarship_id], applicant_nodes[applicant_id], 1,
+            top_score - round(score * SCORE_SCALE),
+        )
+        award_edges[edge] = (application_id, applicant_id, scholarship_id, score)
+    graph.run(source, sink, max_path_cost=top_score)
+
+    return [
+        {"application_id": application_id, "applicant_id": applicant_id,
+         "scholarship_id": scholarship_id, "score": score}
+        for edge, (application_id, applicant_id, scholarship_id, score) in award_edges.items()
+        if graph.flow_on(edge)
+    ]
+
+
+def allocate_awards(scholarships=None, min_score=1, dry_run=False):
+    """
+    Compute the best awards for the given scholarships (all by default) and, unless
+    dry_run, mark their applications as awarded with one UPDATE. Runs that save awards
+    hold the AllocationLock row meanwhile, so they happen one at a time: runs over
+    disjoint scholarships could otherwise both award the same applicant. Dry runs take
+    no lock. Returns the awards, as compute_awards() does.
+    """
+    if scholarships is None:
+        scholarships = Scholarship.objects.all()
+    if dry_run:
+        return compute_awards(scholarships, min_score)
+    with transaction.atomic():
+        AllocationLock.objects.select_for_update().get_or_create(pk=1)
+        awards = compute_awards(scholarships, min_score)
+        if not awards:
+            return awards
+        Application.objects.filter(
+            id__in=[award["application_id"] for award in awards]
+        ).update(awarded=True)
+    applications_awarded.send(sender=Application, count=len(awards))
+    return awards
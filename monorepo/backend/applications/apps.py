@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ApplicationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'applications'
+
+    def ready(self):
+        # Register signal handlers that keep the scholarship matching index fresh.
+        from . import signals  # noqa: F401
@@ -0,0 +1,197 @@
+# monorepo/backend/applications/importer.py
+#
+# Bulk import of applications from NDJSON or CSV. Rows are validated one by one, but the
+# applicants and scholarships they refer to are resolved with one query each per batch,
+# and each batch's valid rows are written with a single bulk_create() in its own
+# transaction. Invalid rows are skipped and reported; they never block the rest. Input
+# that cannot be read at all (bytes that are not UTF-8, malformed CSV quoting) stops the
+# import after the rows read before it, which are imported as usual.
+
+import codecs
+import csv
+import json
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from scholarships.models import Scholarship
+from .models import Application
+from .serializers import ApplicationImportRowSerializer
+from .signals import applications_imported
+
+User = get_user_model()
+
+IMPORT_FORMATS = ("ndjson", "csv")
+IMPORT_BATCH_SIZE = 500
+# CSV columns that map to Application fields; every other column becomes a key in `data`.
+CSV_FIELD_COLUMNS = (
+    "applicant_id", "applicant_username", "scholarship_id", "favorited_by_donor", "awarded",
+)
+
+
+def decode_lines(binary_lines):
+    """
+    Yield the lines of a binary file as text, decoded as UTF-8 (with or without a BOM)
+    one line at a time, so a line that is not UTF-8 raises UnicodeDecodeError only once
+    the lines before it have been read.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    for line in binary_lines:
+        yield decoder.decode(line)
+    # An incomplete character left at the end of the file raises here.
+    decoder.decode(b"", final=True)
+
+
+def read_ndjson(lines):
+    """
+    Yield (line number, record, error) for each non-blank line of an NDJSON stream.
+    """
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line), None
+        except json.JSONDecodeError as e:
+            yield number, None, f"Invalid JSON: {e.msg}"
+
+
+def read_csv(lines):
+    """
+    Yield (line number, record, error) for each CSV row. Blank cells are left out of
+    `data` rather than stored as empty strings.
+    """
+    reader = csv.DictReader(lines)
+    for row in reader:
+        record = {"data": {}}
+        for column, value in row.items():
+            if column is None or value is None or value == "":
+                continue
+            if column in CSV_FIELD_COLUMNS:
+                record[column] = value
+            else:
+                record["data"][column] = value
+        yield reader.line_num, record, None
+
+
+def read_records(lines, format):
+    """
+    Return the record reader for `format` ("ndjson" or "csv") over lines of text.
+    """
+    if format == "ndjson":
+        return read_ndjson(lines)
+    if format == "csv":
+        return read_csv(lines)
+    raise ValueError(
+        f"Unsupported import format {format!r}; use one of {', '.join(IMPORT_FORMATS)}."
+    )
+
+
+def _import_batch(batch, dry_run):
+    """
+    Validate and write one batch of (line number, record, error) tuples.
+    Returns (number created, list of row errors).
+    """
+    errors = []
+    valid = []
+    for number, record, error in batch:
+        if error is not None:
+            errors.append({"row": number, "errors": error})
+            continue
+        serializer = ApplicationImportRowSerializer(data=record)
+        if serializer.is_valid():
+            valid.append((number, serializer.validated_data))
+        else:
+            errors.append({"row": number, "errors": serializer.errors})
+
+    scholarship_ids = set(Scholarship.objects.filter(
+        id__in={row["scholarship_id"] for _, row in valid}
+    ).order_by().values_list("id", flat=True))
+    applicant_ids = set(User.objects.filter(
+        id__in={row["applicant_id"] for _, row in valid if "applicant_id" in row}
+    ).values_list("id", flat=True))
+    applicant_ids_by_username = dict(User.objects.filter(
+        username__in={row["applicant_username"] for _, row in valid if "applicant_id" not in row}
+    ).values_list("username", "id"))
+
+    applications = []
+    for number, row in valid:
+        if "applicant_id" in row:
+            applicant_id = row["applicant_id"] if row["applicant_id"] in applicant_ids else None
+        else:
+            applicant_id = applicant_ids_by_username.get(row["applicant_username"])
+        row_errors = {}
+        if applicant_id is None:
+            row_errors["applicant"] = "Applicant does not exist."
+        if row["scholarship_id"] not in scholarship_ids:
+            row_errors["scholarship_id"] = "Scholarship with this ID does not exist."
+        if row_errors:
+            errors.append({"row": number, "errors": row_errors})
+            continue
+        application = Application(
+            applicant_id=applicant_id,
+            scholarship_id=row["scholarship_id"],
+            data=row["data"],
+            favorited_by_donor=row["favorited_by_donor"],
+            awarded=row["awarded"],
+        )
+        # bulk_create() bypasses save(), which normally fills these columns.
+        application.sync_data_columns()
+        applications.append(application)
+
+    if applications and not dry_run:
+        with transaction.atomic():
+            Application.objects.bulk_create(applications)
+        applications_imported.send(
+            sender=Application, count=len(applications),
+            ids=[application.id for application in applications],
+        )
+    return len(applications), sorted(errors, key=lambda error: error["row"])
+
+
+def _read_batch(records, batch_size):
+    """
+    Take up to `batch_size` records. Returns (batch, error), where error describes input
+    that could not be read, after the records in batch; no records follow it.
+    """
+    batch = []
+    try:
+        for record in islice(records, batch_size):
+            batch.append(record)
+    except (UnicodeDecodeError, csv.Error) as e:
+        return batch, str(e)
+    return batch, None
+
+
+def import_applications(records, batch_size=IMPORT_BATCH_SIZE, dry_run=False):
+    """
+    Import (line number, record, error) tuples from read_records() in batches of
+    `batch_size`. With dry_run, everything is validated but nothing is written ("created"
+    then counts the rows that would have been).
+    Returns {"rows", "created", "errors", "error"}, where errors lists {"row", "errors"}
+    for every row that was skipped, and error is None unless unreadable input stopped
+    the import early.
+    """
+    records = iter(records)
+    summary = {"rows": 0, "created": 0, "errors": [], "error": None}
+    last_line = 0
+    while True:
+        batch, error = _read_batch(records, batch_size)
+        if batch:
+            created, errors = _import_batch(batch, dry_run)
+            summary["rows"] += len(batch)
+            summary["created"] += created
+            summary["errors"].extend(errors)
+            last_line = batch[-1][0]
+        if error is not None:
+            summary["error"] = f"Stopped reading after line {last_line}: {error}"
+            return summary
+        if len(batch) < batch_size:
+            return summary
+
+
+def guess_format(filename):
+    """
+    Pick the import format from a file name's extension, defaulting to NDJSON.
+    """
+    return "csv" if str(filename).lower().endswith(".csv") else "ndjson"
@@ -0,0 +1,169 @@
+# monorepo/backend/applications/jobs.py
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .matching import (
+    bulk_match_applications,
+    get_scholarship_index,
+    ranking_options,
+    rematch_scholarship,
+    save_match_results,
+)
+from .models import Application, MatchJob
+
+logger = logging.getLogger(__name__)
+
+# How many applications a whole-pool job scores and saves at a time.
+POOL_CHUNK_SIZE = 2000
+
+
+def _pending_job(application, scholarship):
+    return MatchJob.objects.filter(
+        status=MatchJob.STATUS_PENDING, application=application, scholarship=scholarship
+    ).first()
+
+
+def enqueue_match_job(application=None, scholarship=None, requested_by=None,
+                      application_ids=None):
+    """
+    Queue a matching run for one application, one scholarship, the applications with
+    `application_ids`, or (with none of these) every application. If an identical job
+    is already pending, that job is returned instead; jobs for a list of IDs are always
+    queued.
+    """
+    if application_ids is not None:
+        return MatchJob.objects.create(
+            application_ids=list(application_ids), requested_by=requested_by
+        )
+    pending = _pending_job(application, scholarship)
+    if pending is not None:
+        return pending
+    try:
+        with transaction.atomic():
+            return MatchJob.objects.create(
+                application=application, scholarship=scholarship, requested_by=requested_by
+            )
+    except IntegrityError:
+        # A concurrent call queued the same job first (matchjob_unique_pending).
+        pending = _pending_job(application, scholarship)
+        if pending is None:
+            raise
+        return pending
+
+
+def claim_job(job_id):
+    """
+    Mark a pending job as running. The conditional UPDATE means that of two callers
+    claiming the same job, only one gets True.
+    """
+    return bool(MatchJob.objects.filter(id=job_id, status=MatchJob.STATUS_PENDING).update(
+        status=MatchJob.STATUS_RUNNING, started_at=timezone.now()
+    ))
+
+
+def fail_jobs(job_ids, error):
+    """Mark those of the given jobs that are still running as failed with `error`."""
+    return MatchJob.objects.filter(id__in=job_ids, status=MatchJob.STATUS_RUNNING).update(
+        status=MatchJob.STATUS_FAILED, error=error, finished_at=timezone.now()
+    )
+
+
+def fail_stale_jobs():
+    """
+    Mark jobs running for longer than MATCH_JOB_TIMEOUT seconds as failed: their worker
+    was killed or lost them, and they would otherwise never finish. Returns the count.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.MATCH_JOB_TIMEOUT)
+    return MatchJob.objects.filter(
+        status=MatchJob.STATUS_RUNNING, started_at__lt=cutoff
+    ).update(
+        status=MatchJob.STATUS_FAILED,
+        error="Timed out; the worker running it stopped.",
+        finished_at=timezone.now(),
+    )
+
+
+def claim_pending_jobs(limit):
+    """
+    Mark up to `limit` of the oldest pending jobs as running and return their IDs.
+    Each job is claimed with claim_job(), so two workers polling at the same time never
+    both run it. Stale running jobs are failed first (see fail_stale_jobs()).
+    """
+    fail_stale_jobs()
+    candidate_ids = MatchJob.objects.filter(
+        status=MatchJob.STATUS_PENDING
+    ).values_list('id', flat=True)[:limit]
+    return [job_id for job_id in candidate_ids if claim_job(job_id)]
+
+
+def _match_in_chunks(applications):
+    """
+    Re-match the applications in `applications` (a queryset) in chunks against one
+    snapshot of the scholarship index.
+    """
+    index = get_scholarship_index()
+    options = ranking_options()
+    application_count = 0
+    match_count = 0
+    chunk = []
+    applications = applications.only('id', 'data').iterator(chunk_size=POOL_CHUNK_SIZE)
+    for application in applications:
+        chunk.append(application)
+        if len(chunk) == POOL_CHUNK_SIZE:
+            match_count += save_match_results({a.id: index.match(a, **options) for a in chunk})
+            application_count += len(chunk)
+            chunk = []
+    if chunk:
+        match_count += save_match_results({a.id: index.match(a, **options) for a in chunk})
+        application_count += len(chunk)
+    return {"applications": application_count, "matches": match_count}
+
+
+def run_match_job(job_id):
+    """
+    Execute a claimed job and record its outcome. Safe to call in a worker process.
+    """
+    job = MatchJob.objects.get(id=job_id)
+    try:
+        if job.application_id is not None:
+            results = bulk_match_applications([job.application], **ranking_options())
+            save_match_results(results)
+            result = {"matches": results[job.application_id]}
+        elif job.scholarship_id is not None:
+            result = {"matches": rematch_scholarship(job.scholarship_id, **ranking_options())}
+        elif job.application_ids is not None:
+            result = _match_in_chunks(Application.objects.filter(id__in=job.application_ids))
+        else:
+            result = _match_in_chunks(Application.objects.all())
+    except Exception as e:
+        logger.exception(f"Match job {job_id} failed")
+        MatchJob.objects.filter(id=job_id).update(
+            status=MatchJob.STATUS_FAILED, error=str(e), finished_at=timezone.now()
+        )
+        return MatchJob.STATUS_FAILED
+    MatchJob.objects.filter(id=job_id).update(
+        status=MatchJob.STATUS_DONE, result=result, finished_at=timezone.now()
+    )
+    return MatchJob.STATUS_DONE
+
+
+def process_pending_jobs(limit, map_fn=map):
+    """
+    Claim up to `limit` pending jobs and run them through `map_fn` (the builtin map runs
+    them inline; the worker command passes a process pool's map). If `map_fn` raises
+    (a broken pool), the claimed jobs it did not finish are marked failed.
+    Returns the number of jobs processed.
+    """
+    job_ids = claim_pending_jobs(limit)
+    try:
+        for _ in map_fn(run_match_job, job_ids):
+            pass
+    except BaseException as e:
+        fail_jobs(job_ids, f"The worker stopped: {e!r}")
+        raise
+    return len(job_ids)
@@ -0,0 +1,156 @@
+import json
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from applications.jobs import claim_job, run_match_job
+from applications.models import Application
+from mybackend.metrics import RequestQueryStats
+from reports import snapshots
+
+User = get_user_model()
+
+BENCHMARK_USERNAME = "benchmark_admin"
+BENCHMARK_PASSWORD = "benchmarkpass"
+
+REPORTS = [
+    "report-available", "report-archived", "report-applicants", "report-awarded",
+    "report-demographics", "report-active-donors", "report-dashboard",
+]
+
+
+def _percentile(samples, percent):
+    ordered = sorted(samples)
+    index = max(0, round(percent / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Times the key endpoints (scholarship listing, application listing, matching, every "
+        "report, login) against the current database and prints p50/p95 latency and query "
+        "counts. Run it on data from generate_load_data for a repeatable baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=1,
+                            help="Untimed calls per endpoint before measuring.")
+        parser.add_argument("--cold", action="store_true",
+                            help="Clear the cache and report snapshots before every call.")
+        parser.add_argument("--only", nargs="*", default=None,
+                            help="Run only the named benchmarks.")
+        parser.add_argument("--json", dest="json_path", default=None,
+                            help="Also write the results to this file as JSON.")
+
+    def handle(self, *args, **options):
+        self.cold = options["cold"]
+        self.client = Client(SERVER_NAME="localhost")
+        user = self._benchmark_user()
+        self.client.force_login(user)
+        application_id = Application.objects.values_list("id", flat=True).first()
+
+        benchmarks = {
+            "scholarship-list": lambda: self.client.get("/api/scholarships/"),
+            "scholarship-list-anonymous": lambda: Client(SERVER_NAME="localhost").get(
+                "/api/scholarships/"
+            ),
+            "application-list": lambda: self.client.get(
+                reverse("application-list"), {"page_size": 50}
+            ),
+            "login": lambda: self.client.post(
+                reverse("login"),
+                {"username": BENCHMARK_USERNAME, "password": BENCHMARK_PASSWORD},
+                content_type="application/json",
+            ),
+        }
+        if application_id is not None:
+            benchmarks["match-application"] = lambda: self._match(application_id)
+        for name in REPORTS:
+            benchmarks[name] = lambda name=name: self.client.get(reverse(name))
+
+        selected = options["only"] or list(benchmarks)
+        unknown = set(selected) - set(benchmarks)
+        if unknown:
+            raise CommandError(f"Unknown benchmark(s): {', '.join(sorted(unknown))}")
+
+        results = {}
+        for name in selected:
+            results[name] = self._run(benchmarks[name], options["iterations"], options["warmup"])
+            self._print_row(name, results[name])
+
+        if options["json_path"]:
+            with open(options["json_path"], "w") as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['json_path']}"))
+
+    def _benchmark_user(self):
+        user = User.objects.filter(username=BENCHMARK_USERNAME).first()
+        if user is None:
+            user = User.objects.create_superuser(
+                username=BENCHMARK_USERNAME,
+                password=BENCHMARK_PASSWORD,
+                email=f"{BENCHMARK_USERNAME}@example.com",
+                role="admin",
+                role_approved=True,
+            )
+        return user
+
+    def _match(self, application_id):
+        response = self.client.post(reverse("application_match", args=[application_id]))
+        # Run the queued job inline so the timing covers the matching itself. Only this
+        # job: the oldest pending one may have been queued by something else.
+        job_id = response.data["job_id"]
+        if claim_job(job_id):
+            run_match_job(job_id)
+        return response
+
+    def _call(self, benchmark):
+        if self.cold:
+            cache.clear()
+            snapshots.bump_version()
+        stats = RequestQueryStats()
+        started = time.perf_counter()
+        with stats.capture():
+            response = benchmark()
+            if response.streaming:
+                for _ in response.streaming_content:
+                    pass
+            response.close()
+        elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            raise CommandError(f"{response.request['PATH_INFO']} returned {response.status_code}")
+        return elapsed, stats.count
+
+    def _run(self, benchmark, iterations, warmup):
+        for _ in range(warmup):
+            self._call(benchmark)
+        timings = []
+        queries = []
+        for _ in range(iterations):
+            elapsed, count = self._call(benchmark)
+            timings.append(elapsed * 1000)
+            queries.append(count)
+        return {
+            "iterations": iterations,
+            "p50_ms": round(statistics.median(timings), 2),
+            "p95_ms": round(_percentile(timings, 95), 2),
+            "mean_ms": round(statistics.fmean(timings), 2),
+            "queries_min": min(queries),
+            "queries_max": max(queries),
+        }
+
+    def _print_row(self, name, result):
+        queries = (
+            str(result["queries_min"]) if result["queries_min"] == result["queries_max"]
+            else f"{result['queries_min']}-{result['queries_max']}"
+        )
+        self.stdout.write(
+            f"{name:<28} p50 {result['p50_ms']:>9.2f} ms   p95 {result['p95_ms']:>9.2f} ms   "
+            f"queries {queries}"
+        )
@@ -0,0 +1,237 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from applications.matching import invalidate_scholarship_index
+from applications.models import Application, MatchJob, MatchResult
+from documents.models import Document
+from reports import snapshots
+from scholarships import cache as scholarship_cache
+from scholarships.models import Scholarship
+
+User = get_user_model()
+
+
+MAJORS = [
+    "Computer Science", "Electrical Engineering", "Mechanical Engineering", "Biology",
+    "Chemistry", "Mathematics", "Physics", "Economics", "Psychology", "Nursing",
+    "Business Administration", "English", "History", "Civil Engineering", "Music",
+]
+YEARS = ["Freshman", "Sophomore", "Junior", "Senior", "Graduate"]
+ETHNICITIES = [
+    "Hispanic or Latino", "White", "Black or African American", "Asian",
+    "American Indian or Alaska Native", "Native Hawaiian or Pacific Islander",
+    "Two or more races", "Prefer not to say",
+]
+PRONOUNS = ["she/her", "he/him", "they/them", ""]
+WORDS = (
+    "research leadership community service engineering design team project award student "
+    "internship volunteer tutoring laboratory analysis innovation outreach mentor"
+).split()
+
+
+def _sentence(rng, words=12):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-creates synthetic users, scholarships, applications, bookmarks and documents "
+        "for load testing. All generated rows are tagged with --prefix so they can be "
+        "removed again with --clear."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--donors", type=int, default=None,
+                            help="Donor accounts among --users (default: 2%%).")
+        parser.add_argument("--scholarships", type=int, default=200)
+        parser.add_argument("--applications", type=int, default=5000)
+        parser.add_argument("--bookmarks", type=int, default=3,
+                            help="Bookmarks per applicant.")
+        parser.add_argument("--documents", type=int, default=100)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=0,
+                            help="Random seed, so runs are reproducible.")
+        parser.add_argument("--prefix", default="load")
+        parser.add_argument("--password", default="loadpass",
+                            help="Password set on every generated user.")
+        parser.add_argument("--clear", action="store_true",
+                            help="Delete data from a previous run with this prefix and exit.")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.prefix = options["prefix"]
+        self.batch_size = options["batch_size"]
+        if options["clear"]:
+            self.clear()
+        else:
+            if User.objects.filter(username__startswith=f"{self.prefix}_").exists():
+                self.stdout.write(self.style.ERROR(
+                    f"Load data with prefix '{self.prefix}' already exists; "
+                    "run with --clear first or choose another --prefix."
+                ))
+                return
+            users = options["users"]
+            donors = options["donors"] if options["donors"] is not None else max(1, users // 50)
+            donor_ids, applicant_ids = self.create_users(users, donors, options["password"])
+            scholarship_ids = self.create_scholarships(options["scholarships"], donor_ids)
+            self.create_applications(options["applications"], applicant_ids, scholarship_ids)
+            self.create_bookmarks(options["bookmarks"], applicant_ids, scholarship_ids)
+            self.create_documents(options["documents"], applicant_ids)
+        # bulk_create() skips the signals that normally expire these; expire everything
+        # once instead.
+        snapshots.bump_version()
+        invalidate_scholarship_index()
+        cache.delete(scholarship_cache.LIST_KEY)
+
+    def clear(self):
+        users = User.objects.filter(username__startswith=f"{self.prefix}_")
+        scholarships = Scholarship.objects.filter(name__startswith=f"{self.prefix}:")
+        for document in Document.objects.filter(user__in=users).iterator():
+            document.file.delete(save=False)
+        applications = Application.objects.filter(
+            Q(applicant__in=users) | Q(scholarship__in=scholarships)
+        )
+        match_rows = Q(application__in=applications) | Q(scholarship__in=scholarships)
+        Bookmark = Scholarship.bookmarked_by.through
+        # Children before parents, one table at a time, so each delete finds nothing left
+        # to cascade to. Delete signals still run for the models that have receivers.
+        tables = [
+            MatchResult.objects.filter(match_rows),
+            MatchJob.objects.filter(match_rows),
+            applications,
+            Bookmark.objects.filter(Q(myuser__in=users) | Q(scholarship__in=scholarships)),
+            Document.objects.filter(user__in=users),
+            scholarships,
+            # Cascades to any other rows the users have since gained.
+            users,
+        ]
+        deleted = 0
+        with transaction.atomic():
+            for queryset in tables:
+                deleted += queryset.delete()[0]
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} load-data row(s)."))
+
+    def _bulk_create(self, model, objects, **kwargs):
+        created = model.objects.bulk_create(objects, batch_size=self.batch_size, **kwargs)
+        self.stdout.write(f"  {model.__name__}: {len(objects)}")
+        return created
+
+    def create_users(self, count, donors, password):
+        # Hashing is deliberately slow, so every user shares one hash.
+        password_hash = make_password(password)
+        users = []
+        for n in range(count):
+            is_donor = n < donors
+            users.append(User(
+                username=f"{self.prefix}_{'donor' if is_donor else 'student'}_{n}",
+                email=f"{self.prefix}_{n}@example.com",
+                password=password_hash,
+                first_name=f"First{n}",
+                last_name=f"Last{n}",
+                phone=f"555{n:07d}",
+                net_id=f"{self.prefix}{n}",
+                gpa=None if is_donor else round(self.rng.uniform(2.0, 4.0), 2),
+                major="" if is_donor else self.rng.choice(MAJORS),
+                role="donor" if is_donor else "applicant",
+                role_approved=True,
+            ))
+        with transaction.atomic():
+            self._bulk_create(User, users)
+        ids = User.objects.filter(username__startswith=f"{self.prefix}_").values_list(
+            "id", "role"
+        )
+        donor_ids = [user_id for user_id, role in ids if role == "donor"]
+        applicant_ids = [user_id for user_id, role in ids if role != "donor"]
+        return donor_ids, applicant_ids
+
+    def create_scholarships(self, count, donor_ids):
+        today = date.today()
+        scholarships = [
+            Scholarship(
+                name=f"{self.prefix}: {self.rng.choice(WORDS).title()} Scholarship {n}",
+                description=_sentence(self.rng, 25),
+                amount=Decimal(self.rng.randrange(500, 10001, 250)),
+                deadline=today + timedelta(days=self.rng.randint(-60, 180)),
+                is_active=self.rng.random() < 0.8,
+                quantity=self.rng.randint(1, 5),
+                donor_id=self.rng.choice(donor_ids) if donor_ids else None,
+                min_gpa=Decimal(f"{self.rng.uniform(2.0, 3.8):.2f}") if self.rng.random() < 0.9 else None,
+                allowed_major=self.rng.choice(MAJORS) if self.rng.random() < 0.7 else "",
+            )
+            for n in range(count)
+        ]
+        with transaction.atomic():
+            self._bulk_create(Scholarship, scholarships)
+        return list(
+            Scholarship.objects.filter(name__startswith=f"{self.prefix}:").values_list("id", flat=True)
+        )
+
+    def _application_data(self, n):
+        return {
+            "pronoun": self.rng.choice(PRONOUNS),
+            "student_id": f"S{n:08d}",
+            "major": self.rng.choice(MAJORS),
+            "minor": self.rng.choice(MAJORS) if self.rng.random() < 0.3 else "",
+            "gpa": f"{self.rng.uniform(2.0, 4.0):.2f}",
+            "year": self.rng.choice(YEARS),
+            "ethnicity": self.rng.choice(ETHNICITIES),
+            "personal_statement": " ".join(_sentence(self.rng) for _ in range(8)),
+            "work_experience": _sentence(self.rng, 20),
+        }
+
+    def create_applications(self, count, applicant_ids, scholarship_ids):
+        if not applicant_ids or not scholarship_ids:
+            return
+        created = 0
+        while created < count:
+            batch = []
+            for n in range(created, min(count, created + self.batch_size)):
+                application = Application(
+                    applicant_id=self.rng.choice(applicant_ids),
+                    scholarship_id=self.rng.choice(scholarship_ids),
+                    data=self._application_data(n),
+                    favorited_by_donor=self.rng.random() < 0.05,
+                    awarded=self.rng.random() < 0.02,
+                )
+                # bulk_create() bypasses save(), which normally fills these columns.
+                application.sync_data_columns()
+                batch.append(application)
+            with transaction.atomic():
+                Application.objects.bulk_create(batch)
+            created += len(batch)
+        self.stdout.write(f"  Application: {created}")
+
+    def create_bookmarks(self, per_user, applicant_ids, scholarship_ids):
+        if not per_user or not scholarship_ids:
+            return
+        Bookmark = Scholarship.bookmarked_by.through
+        bookmarks = [
+            Bookmark(myuser_id=user_id, scholarship_id=scholarship_id)
+            for user_id in applicant_ids
+            for scholarship_id in self.rng.sample(scholarship_ids, min(per_user, len(scholarship_ids)))
+        ]
+        with transaction.atomic():
+            self._bulk_create(Bookmark, bookmarks, ignore_conflicts=True)
+
+    def create_documents(self, count, applicant_ids):
+        if not applicant_ids:
+            return
+        for n in range(count):
+            # Document.file's upload_to reads instance.user.
+            document = Document(user=User(id=self.rng.choice(applicant_ids)))
+            document.file.save(
+                f"{self.prefix}_transcript_{n}.txt",
+                ContentFile(_sentence(self.rng, 40).encode()),
+                save=True,
+            )
+        self.stdout.write(f"  Document: {count}")
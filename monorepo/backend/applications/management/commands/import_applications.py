@@ -0,0 +1,62 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from applications.importer import (
+    IMPORT_BATCH_SIZE,
+    IMPORT_FORMATS,
+    decode_lines,
+    guess_format,
+    import_applications,
+    read_records,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-imports applications from an NDJSON or CSV file. Each NDJSON line is an object "
+        "with applicant_id or applicant_username, scholarship_id and data; CSV files use "
+        "the same columns, with every other column stored in data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import; '-' reads standard input.")
+        parser.add_argument("--format", choices=IMPORT_FORMATS, default=None,
+                            help="Input format (default: from the file extension).")
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Validate every row without saving anything.")
+        parser.add_argument("--max-errors", type=int, default=50,
+                            help="Number of row errors to print.")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        format = options["format"] or guess_format(path)
+        try:
+            if path == "-":
+                summary = self._import(sys.stdin.buffer, format, options)
+            else:
+                with open(path, "rb") as f:
+                    summary = self._import(f, format, options)
+        except OSError as e:
+            raise CommandError(f"Cannot read {path}: {e}")
+
+        for error in summary["errors"][:options["max_errors"]]:
+            self.stdout.write(self.style.WARNING(f"Row {error['row']}: {error['errors']}"))
+        hidden = len(summary["errors"]) - options["max_errors"]
+        if hidden > 0:
+            self.stdout.write(self.style.WARNING(f"... and {hidden} more error(s)."))
+        verb = "Would import" if options["dry_run"] else "Imported"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {summary['created']} of {summary['rows']} row(s); "
+            f"{len(summary['errors'])} skipped."
+        ))
+        if summary["error"] is not None:
+            raise CommandError(summary["error"])
+
+    def _import(self, lines, format, options):
+        return import_applications(
+            read_records(decode_lines(lines), format),
+            batch_size=options["batch_size"],
+            dry_run=options["dry_run"],
+        )
@@ -0,0 +1,65 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+from django.core.management.base import BaseCommand
+
+
+def _init_worker_process():
+    # Spawned children start from a fresh interpreter; DJANGO_SETTINGS_MODULE is inherited.
+    django.setup()
+
+
+class Command(BaseCommand):
+    help = "Processes queued match jobs with a pool of worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes", type=int, default=os.cpu_count() or 1,
+            help="Number of worker processes (default: CPU count).",
+        )
+        parser.add_argument(
+            "--poll-interval", type=float, default=2.0,
+            help="Seconds to wait between polls when the queue is empty.",
+        )
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Exit as soon as the queue is empty instead of polling forever.",
+        )
+
+    def handle(self, *args, **options):
+        processes = max(1, options["processes"])
+        self.stdout.write(f"Match worker started with {processes} process(es).")
+        while True:
+            # Spawn rather than fork so children never share this process's open DB
+            # connection.
+            pool = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker_process,
+            )
+            try:
+                with pool:
+                    self._poll(pool, processes, options)
+                break
+            except BrokenProcessPool as e:
+                # process_pending_jobs() has marked the jobs it was running as failed.
+                self.stderr.write(f"Worker pool broke ({e}); starting a new one.")
+        self.stdout.write(self.style.SUCCESS("Match worker stopped."))
+
+    def _poll(self, pool, processes, options):
+        # Imported here so that spawned children can unpickle _init_worker_process
+        # before Django is set up.
+        from applications.jobs import process_pending_jobs
+
+        while True:
+            processed = process_pending_jobs(processes, map_fn=pool.map)
+            if processed:
+                self.stdout.write(f"Processed {processed} match job(s).")
+                continue
+            if options["once"]:
+                return
+            time.sleep(options["poll_interval"])
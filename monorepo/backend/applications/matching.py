@@ -1,41 +1,377 @@
 # monorepo/backend/applications/matching.py
 
+import heapq
+from array import array
+from bisect import bisect_right
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from mybackend.caching import invalidated_timeout
 from scholarships.models import Scholarship
+from .models import Application, MatchResult
+
+# Cache entry holding the ScholarshipMatrix for all active scholarships. It is dropped
+# whenever a Scholarship is saved or deleted (see applications/signals.py); the timeout only
+# bounds staleness from writes that bypass signals, such as QuerySet.update().
+SCHOLARSHIP_INDEX_CACHE_KEY = 'applications:scholarship-index:v2'
+SCHOLARSHIP_INDEX_TIMEOUT = 300
+
+# Sort position of a scholarship without a deadline when ranking: after every real date.
+NO_DEADLINE = date.max.toordinal()
+
+
+def _parse_gpa(value):
+    """
+    Convert an application's raw 'gpa' value into a float, or None if it is missing or
+    cannot be parsed.
+    """
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _normalize_major(value):
+    """
+    Lower-case a major string for comparison; anything that is not a non-empty string
+    counts as "no major".
+    """
+    if isinstance(value, str) and value.strip():
+        return value.strip().lower()
+    return None
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
 
 def calculate_match_score(application, scholarship):
     """
     A simple matching algorithm.
-    For example, if the application JSON field 'data' contains a 'gpa' and the scholarship has
-    a 'required_gpa' field, award 1 point if the applicant's GPA is greater than or equal to required_gpa.
-    Similarly, if the application contains a 'major' and the scholarship specifies a 'required_major',
-    award another point if they match.
+    Award 1 point if the application's 'gpa' is greater than or equal to the scholarship's
+    min_gpa, and another point if the scholarship's allowed_major appears in the
+    application's 'major'. Criteria the scholarship leaves blank do not score.
     """
     score = 0
     app_data = application.data
-    # Check GPA if available and if scholarship has 'required_gpa'
-    if 'gpa' in app_data and hasattr(scholarship, 'required_gpa'):
-        try:
-            if float(app_data['gpa']) >= float(scholarship.required_gpa):
-                score += 1
-        except (ValueError, TypeError):
-            pass
-    # Check major if available and if scholarship has 'required_major'
-    if 'major' in app_data and hasattr(scholarship, 'required_major'):
-        if scholarship.required_major.lower() in app_data['major'].lower():
+    gpa = _parse_gpa(app_data.get('gpa'))
+    if gpa is not None and scholarship.min_gpa is not None:
+        if gpa >= float(scholarship.min_gpa):
+            score += 1
+    major = _normalize_major(app_data.get('major'))
+    required_major = _normalize_major(scholarship.allowed_major)
+    if major is not None and required_major is not None:
+        if required_major in major:
             score += 1
     return score
 
-def match_applications_to_scholarships(application, scholarships_queryset):
+
+class ScholarshipMatrix:
+    """
+    Column-oriented snapshot of the scholarships' matching criteria.
+
+    The scholarships are loaded once into compact arrays so that many applications can be
+    scored without touching model instances:
+
+    * GPA thresholds are kept sorted, so the scholarships an applicant's GPA satisfies are
+      a prefix found with a single bisect.
+    * Scholarships are grouped by normalized major, and the distinct majors are indexed by
+      trigram, so only the majors that can occur in the applicant's major are compared.
+
+    Scores match calculate_match_score() exactly. Each scholarship's deadline and amount
+    are kept as well, to break ties when ranking.
+    """
+
+    def __init__(self, rows):
+        """
+        rows: iterable of (scholarship_id, min_gpa, allowed_major[, deadline, amount])
+        tuples, in the order unranked matches should be reported.
+        """
+        self.ids = array('q')
+        # Per scholarship, the tie-break part of its ranking key (see rank()).
+        self.tiebreaks = []
+        thresholds = []
+        self.major_groups = {}
+        for index, (scholarship_id, min_gpa, allowed_major, *extra) in enumerate(rows):
+            deadline, amount = extra or (None, None)
+            self.ids.append(scholarship_id)
+            self.tiebreaks.append((
+                deadline.toordinal() if deadline is not None else NO_DEADLINE,
+                -float(amount) if amount is not None else 0.0,
+                scholarship_id,
+            ))
+            if min_gpa is not None:
+                thresholds.append((float(min_gpa), index))
+            major = _normalize_major(allowed_major)
+            if major is not None:
+                self.major_groups.setdefault(major, array('l')).append(index)
+        thresholds.sort()
+        self.gpa_thresholds = array('d', (t for t, _ in thresholds))
+        self.gpa_order = array('l', (i for _, i in thresholds))
+        self._build_major_index()
+
+    def _build_major_index(self):
+        """
+        Inverted index from trigram to the required majors containing it.
+
+        A required major can only be a substring of the applicant's major if every one of
+        its trigrams also occurs there, so each major is filed under its rarest trigram and
+        only the majors filed under one of the applicant's trigrams need the real substring
+        test. Majors shorter than a trigram are always candidates.
+        """
+        frequency = {}
+        for major in self.major_groups:
+            for gram in _trigrams(major):
+                frequency[gram] = frequency.get(gram, 0) + 1
+        self.major_index = {}
+        self.short_majors = []
+        for major in self.major_groups:
+            grams = _trigrams(major)
+            if not grams:
+                self.short_majors.append(major)
+                continue
+            key = min(grams, key=lambda gram: (frequency[gram], gram))
+            self.major_index.setdefault(key, []).append(major)
+
+    def candidate_majors(self, major):
+        """
+        Return the required majors that appear in the given normalized applicant major.
+        """
+        candidates = set(self.short_majors)
+        for gram in _trigrams(major):
+            candidates.update(self.major_index.get(gram, ()))
+        return [required_major for required_major in candidates if required_major in major]
+
+    @classmethod
+    def from_queryset(cls, scholarships_queryset=None):
+        """
+        Build the matrix from a Scholarship queryset (all active scholarships by default),
+        fetching only the columns matching needs.
+        """
+        if scholarships_queryset is None:
+            scholarships_queryset = Scholarship.objects.filter(is_active=True)
+        return cls(scholarships_queryset.values_list(
+            'id', 'min_gpa', 'allowed_major', 'deadline', 'amount'
+        ))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def scores(self, app_data):
+        """
+        Return {column index: score} for every scholarship scoring > 0 against the given
+        application data.
+        """
+        scores = {}
+        gpa = _parse_gpa(app_data.get('gpa'))
+        if gpa is not None:
+            for index in self.gpa_order[:bisect_right(self.gpa_thresholds, gpa)]:
+                scores[index] = 1
+        major = _normalize_major(app_data.get('major'))
+        if major is not None:
+            for required_major in self.candidate_majors(major):
+                for index in self.major_groups[required_major]:
+                    scores[index] = scores.get(index, 0) + 1
+        return scores
+
+    def rank(self, scores, top_k=None, min_score=1):
+        """
+        Order the (column index, score) pairs scoring at least min_score best first:
+        higher score, then earlier deadline (none last), then larger amount, then lower ID.
+        With top_k, only the best top_k are kept, selected with a heap bounded at top_k
+        entries rather than by sorting every match.
+        """
+        candidates = (item for item in scores.items() if item[1] >= min_score)
+
+        def key(item):
+            return (-item[1],) + self.tiebreaks[item[0]]
+
+        if top_k is None:
+            return sorted(candidates, key=key)
+        return heapq.nsmallest(top_k, candidates, key=key)
+
+    def match(self, application, top_k=None, min_score=1):
+        """
+        Same result shape as match_applications_to_scholarships(): a list of
+        {"scholarship_id", "score"} dicts for scores of at least min_score. Without top_k
+        they are in scholarship order; with it, only the top_k best, ranked by rank().
+        """
+        scores = self.scores(application.data)
+        if top_k is None:
+            ordered = [(index, scores[index]) for index in sorted(scores)
+                       if scores[index] >= min_score]
+        else:
+            ordered = self.rank(scores, top_k, min_score)
+        return [
+            {"scholarship_id": self.ids[index], "score": score} for index, score in ordered
+        ]
+
+
+def get_scholarship_index():
+    """
+    Return the ScholarshipMatrix for all active scholarships, building and caching it if
+    it has been invalidated.
+    """
+    index = cache.get(SCHOLARSHIP_INDEX_CACHE_KEY)
+    if index is None:
+        index = ScholarshipMatrix.from_queryset()
+        cache.set(
+            SCHOLARSHIP_INDEX_CACHE_KEY, index, invalidated_timeout(SCHOLARSHIP_INDEX_TIMEOUT)
+        )
+    return index
+
+
+def invalidate_scholarship_index():
+    cache.delete(SCHOLARSHIP_INDEX_CACHE_KEY)
+
+
+def ranking_options():
+    """
+    The ranking configured for stored match runs: keep the MATCH_TOP_K best matches per
+    application (all when unset) scoring at least MATCH_MIN_SCORE.
+    """
+    return {"top_k": settings.MATCH_TOP_K, "min_score": settings.MATCH_MIN_SCORE}
+
+
+def match_applications_to_scholarships(application, scholarships_queryset, top_k=None,
+                                       min_score=1):
     """
     For a given application and a queryset of scholarships, calculate the match score for each
-    scholarship and return a list of matches (only if score > 0).
-    """
-    matches = []
-    for scholarship in scholarships_queryset:
-        score = calculate_match_score(application, scholarship)
-        if score > 0:
-            matches.append({
-                "scholarship_id": scholarship.id,
-                "score": score,
-            })
-    return matches
+    scholarship and return a list of matches (only if score >= min_score). With top_k, only
+    the top_k best are returned, best first.
+    """
+    return ScholarshipMatrix.from_queryset(scholarships_queryset).match(
+        application, top_k, min_score
+    )
+
+
+def bulk_match_applications(applications, scholarships_queryset=None, top_k=None,
+                            min_score=1):
+    """
+    Score many applications in one pass against a single snapshot of the scholarships
+    (all active scholarships by default), keeping the top_k best per application if given.
+    Returns {application_id: [{"scholarship_id", "score"}, ...]}.
+    """
+    if scholarships_queryset is None:
+        matrix = get_scholarship_index()
+    else:
+        matrix = ScholarshipMatrix.from_queryset(scholarships_queryset)
+    return {
+        application.id: matrix.match(application, top_k, min_score)
+        for application in applications
+    }
+
+
+def _replace_match_rows(rows, scope, batch_size):
+    """
+    Upsert `rows` and delete every other MatchResult in `scope` (a queryset covering the
+    pairs this run recomputed), all in one transaction. Returns the number of rows written.
+    """
+    with transaction.atomic():
+        run_started = timezone.now()
+        MatchResult.objects.bulk_create(
+            rows,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=["application", "scholarship"],
+            update_fields=["score", "matched_at"],
+        )
+        # Every row touched above now has matched_at >= run_started; anything older in
+        # scope was superseded by this run.
+        scope.filter(matched_at__lt=run_started).delete()
+    return len(rows)
+
+
+def save_match_results(results, batch_size=1000):
+    """
+    Persist a matching run. results is {application_id: [{"scholarship_id", "score"}, ...]}
+    as returned by bulk_match_applications().
+
+    All rows are written with one bulk upsert on the (application, scholarship) key, and
+    any older score for the same applications that this run did not produce is deleted,
+    all inside a single transaction. Returns the number of rows written.
+    """
+    rows = [
+        MatchResult(
+            application_id=application_id,
+            scholarship_id=match["scholarship_id"],
+            score=match["score"],
+        )
+        for application_id, matches in results.items()
+        for match in matches
+    ]
+    scope = MatchResult.objects.filter(application_id__in=list(results))
+    return _replace_match_rows(rows, scope, batch_size)
+
+
+def _scholarship_scores(scholarship_id, batch_size):
+    """
+    Yield (application_id, score) for every application scoring > 0 against one active
+    scholarship. Only each application's 'gpa' and 'major' keys are fetched, and scored
+    as match() scores them; the indexed gpa and major columns only filter out, in the
+    query, applications that cannot score.
+    """
+    rows = list(Scholarship.objects.filter(id=scholarship_id, is_active=True).values_list(
+        'id', 'min_gpa', 'allowed_major'
+    ))
+    if not rows:
+        return
+    matrix = ScholarshipMatrix(rows)
+    _, min_gpa, allowed_major = rows[0]
+    can_score = Q(pk__in=[])
+    if min_gpa is not None:
+        can_score |= Q(gpa__gte=min_gpa)
+    if _normalize_major(allowed_major) is not None:
+        # The column holds str() of any major, so it is blank only when 'major' is.
+        can_score |= ~Q(major='')
+    applications = Application.objects.filter(can_score).values_list(
+        'id', 'data__gpa', 'data__major'
+    ).iterator(chunk_size=batch_size)
+    for application_id, gpa, major in applications:
+        score = matrix.scores({'gpa': gpa, 'major': major}).get(0)
+        if score:
+            yield application_id, score
+
+
+def rematch_scholarship(scholarship_id, batch_size=1000, top_k=None, min_score=1):
+    """
+    Bring the stored matches up to date after one scholarship changed. An inactive or
+    missing scholarship simply loses all its rows. Returns the number of rows written.
+
+    Without top_k, only this scholarship's MatchResult rows are recomputed. With top_k,
+    the change can push other scholarships into or out of an application's top_k, so every
+    application that scores against it now, or had a row for it before, is re-ranked
+    against all active scholarships.
+    """
+    if top_k is None:
+        rows = [
+            MatchResult(application_id=application_id, scholarship_id=scholarship_id,
+                        score=score)
+            for application_id, score in _scholarship_scores(scholarship_id, batch_size)
+            if score >= min_score
+        ]
+        scope = MatchResult.objects.filter(scholarship_id=scholarship_id)
+        return _replace_match_rows(rows, scope, batch_size)
+
+    affected = {
+        application_id for application_id, _ in _scholarship_scores(scholarship_id, batch_size)
+    }
+    affected.update(MatchResult.objects.filter(scholarship_id=scholarship_id)
+                    .values_list('application_id', flat=True))
+    affected = sorted(affected)
+    index = get_scholarship_index()
+    written = 0
+    for start in range(0, len(affected), batch_size):
+        applications = Application.objects.filter(
+            id__in=affected[start:start + batch_size]
+        ).only('id', 'data')
+        written += save_match_results({
+            application.id: index.match(application, top_k, min_score)
+            for application in applications
+        }, batch_size)
+    return written
@@ -0,0 +1,32 @@
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def remove_duplicate_match_results(apps, schema_editor):
+    """
+    Keep only the most recent MatchResult per (application, scholarship) pair so the
+    unique constraint can be added.
+    """
+    MatchResult = apps.get_model('applications', 'MatchResult')
+    latest_ids = (
+        MatchResult.objects.values('application_id', 'scholarship_id')
+        .annotate(latest_id=Max('id'))
+        .values_list('latest_id', flat=True)
+    )
+    MatchResult.objects.exclude(id__in=list(latest_ids)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0002_application_awarded'),
+        ('scholarships', '0008_scholarship_quantity'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_match_results, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='matchresult',
+            constraint=models.UniqueConstraint(fields=('application', 'scholarship'), name='unique_match_result'),
+        ),
+    ]
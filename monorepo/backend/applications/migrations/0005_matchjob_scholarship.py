@@ -0,0 +1,20 @@
+# Generated by Django 5.1.6 on 2026-10-18 13:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0004_matchjob'),
+        ('scholarships', '0008_scholarship_quantity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='matchjob',
+            name='scholarship',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='scholarships.scholarship'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.6 on 2026-10-18 13:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0005_matchjob_scholarship'),
+        ('scholarships', '0008_scholarship_quantity'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['-submitted_at', '-id'], name='application_submitted_id'),
+        ),
+    ]
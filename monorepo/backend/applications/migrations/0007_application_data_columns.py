@@ -0,0 +1,72 @@
+# Generated by Django 5.1.6 on 2026-10-18 13:14
+
+from django.db import migrations, models
+
+
+def backfill_data_columns(apps, schema_editor):
+    """
+    Populate the new columns from each existing application's data JSON.
+    (Mirrors applications.models.extract_data_columns at the time of this migration.)
+    """
+    Application = apps.get_model('applications', 'Application')
+
+    def text(data, key, max_length):
+        value = data.get(key)
+        return '' if value is None else str(value)[:max_length]
+
+    fields = ['major', 'gpa', 'year', 'student_id', 'ethnicity']
+    last_id = 0
+    while True:
+        batch = list(
+            Application.objects.filter(id__gt=last_id).order_by('id').only('id', 'data')[:2000]
+        )
+        if not batch:
+            break
+        for application in batch:
+            data = application.data if isinstance(application.data, dict) else {}
+            try:
+                application.gpa = float(data.get('gpa'))
+            except (ValueError, TypeError):
+                application.gpa = None
+            application.major = text(data, 'major', 100)
+            application.year = text(data, 'year', 50)
+            application.student_id = text(data, 'student_id', 50)
+            application.ethnicity = text(data, 'ethnicity', 100)
+        Application.objects.bulk_update(batch, fields)
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0006_application_submitted_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='ethnicity',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='application',
+            name='gpa',
+            field=models.FloatField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='application',
+            name='major',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='application',
+            name='student_id',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='application',
+            name='year',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=50),
+        ),
+        migrations.RunPython(backfill_data_columns, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.6 on 2026-10-18 14:11
+
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+
+
+def drop_duplicate_pending_jobs(apps, schema_editor):
+    """Keep the oldest pending job per target; the constraint allows only one."""
+    MatchJob = apps.get_model('applications', 'MatchJob')
+    seen = set()
+    duplicates = []
+    pending = MatchJob.objects.filter(status='pending').order_by('created_at', 'id')
+    for job_id, application_id, scholarship_id in pending.values_list(
+        'id', 'application_id', 'scholarship_id'
+    ):
+        if (application_id, scholarship_id) in seen:
+            duplicates.append(job_id)
+        seen.add((application_id, scholarship_id))
+    MatchJob.objects.filter(id__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0007_application_data_columns'),
+        ('scholarships', '0008_scholarship_quantity'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_pending_jobs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='matchjob',
+            constraint=models.UniqueConstraint(django.db.models.functions.comparison.Coalesce('application', models.Value(0)), django.db.models.functions.comparison.Coalesce('scholarship', models.Value(0)), condition=models.Q(('status', 'pending')), name='matchjob_unique_pending'),
+        ),
+    ]
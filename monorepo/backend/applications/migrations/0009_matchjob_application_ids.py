@@ -0,0 +1,30 @@
+# Generated by Django 5.1.6 on 2026-10-18 14:21
+
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0008_matchjob_unique_pending'),
+        ('scholarships', '0008_scholarship_quantity'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='matchjob',
+            name='matchjob_unique_pending',
+        ),
+        migrations.AddField(
+            model_name='matchjob',
+            name='application_ids',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='matchjob',
+            constraint=models.UniqueConstraint(django.db.models.functions.comparison.Coalesce('application', models.Value(0)), django.db.models.functions.comparison.Coalesce('scholarship', models.Value(0)), condition=models.Q(('application_ids__isnull', True), ('status', 'pending')), name='matchjob_unique_pending'),
+        ),
+    ]
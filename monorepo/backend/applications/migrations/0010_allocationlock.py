@@ -0,0 +1,25 @@
+# Generated by Django 5.1.6 on 2026-10-18 14:48
+
+from django.db import migrations, models
+
+
+def create_lock_row(apps, schema_editor):
+    """Create the row up front, so concurrent first runs do not both insert it."""
+    apps.get_model('applications', 'AllocationLock').objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0009_matchjob_application_ids'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AllocationLock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+        ),
+        migrations.RunPython(create_lock_row, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,38 @@
 from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Coalesce
 from accounts.models import MyUser
 from scholarships.models import Scholarship
 
+# Keys of Application.data that are also stored in their own indexed columns.
+DATA_COLUMNS = ("major", "gpa", "year", "student_id", "ethnicity")
+
+
+def extract_data_columns(data):
+    """
+    Pull the commonly filtered keys out of an application's data JSON, typed for the
+    denormalized columns on Application. Missing or unparseable values become ''/None.
+    """
+    if not isinstance(data, dict):
+        data = {}
+
+    def text(key, max_length):
+        value = data.get(key)
+        return "" if value is None else str(value)[:max_length]
+
+    try:
+        gpa = float(data.get("gpa"))
+    except (ValueError, TypeError):
+        gpa = None
+    return {
+        "major": text("major", 100),
+        "gpa": gpa,
+        "year": text("year", 50),
+        "student_id": text("student_id", 50),
+        "ethnicity": text("ethnicity", 100),
+    }
+
+
 class Application(models.Model):
     applicant = models.ForeignKey(MyUser, on_delete=models.CASCADE)
     scholarship = models.ForeignKey(Scholarship, on_delete=models.CASCADE)
@@ -10,14 +41,118 @@ class Application(models.Model):
     favorited_by_donor = models.BooleanField(default=False)
     awarded = models.BooleanField(default=False)
 
+    # Indexed copies of frequently filtered keys in `data`, kept in sync by save().
+    major = models.CharField(max_length=100, blank=True, default="", db_index=True)
+    gpa = models.FloatField(null=True, blank=True, db_index=True)
+    year = models.CharField(max_length=50, blank=True, default="", db_index=True)
+    student_id = models.CharField(max_length=50, blank=True, default="", db_index=True)
+    ethnicity = models.CharField(max_length=100, blank=True, default="", db_index=True)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination order used by ApplicationCursorPagination.
+            models.Index(fields=["-submitted_at", "-id"], name="application_submitted_id"),
+        ]
+
     def __str__(self):
         return f"{self.applicant.username} - {self.scholarship.name}"
 
+    def sync_data_columns(self):
+        """
+        Copy the filterable keys from `data` into their columns. Call this before
+        bulk_create()/bulk_update(), which bypass save().
+        """
+        for field, value in extract_data_columns(self.data).items():
+            setattr(self, field, value)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "data" in update_fields:
+            self.sync_data_columns()
+            if update_fields is not None:
+                kwargs["update_fields"] = set(update_fields) | set(DATA_COLUMNS)
+        super().save(*args, **kwargs)
+
+class AllocationLock(models.Model):
+    """
+    A single row, locked with select_for_update() by applications/allocation.py so award
+    allocation runs happen one at a time without locking the scholarships themselves.
+    """
+
+    def __str__(self):
+        return "Award allocation lock"
+
 class MatchResult(models.Model):
     application = models.ForeignKey(Application, on_delete=models.CASCADE)
     scholarship = models.ForeignKey(Scholarship, on_delete=models.CASCADE)
     score = models.FloatField(default=0.0)
     matched_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            # One score per (application, scholarship) pair; re-running matching upserts it.
+            models.UniqueConstraint(
+                fields=["application", "scholarship"], name="unique_match_result"
+            ),
+        ]
+
+    def __str__(self):
+        return f"Application {self.application.id} -> Scholarship {self.scholarship.id} (Score: {self.score})"
+
+class MatchJob(models.Model):
+    """
+    A queued matching run, processed by the run_match_worker management command.
+    A job for an application re-matches it against every active scholarship, a job for a
+    scholarship re-matches every application against it, a job with application_ids
+    re-matches those applications (an import batch), and a job for none of these
+    re-matches the whole pool.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = (
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    )
+
+    application = models.ForeignKey(Application, on_delete=models.CASCADE, null=True, blank=True)
+    scholarship = models.ForeignKey(Scholarship, on_delete=models.CASCADE, null=True, blank=True)
+    application_ids = models.JSONField(null=True, blank=True)
+    requested_by = models.ForeignKey(MyUser, on_delete=models.SET_NULL, null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [
+            # The worker polls for the oldest pending jobs.
+            models.Index(fields=["status", "created_at"], name="matchjob_status_created"),
+        ]
+        constraints = [
+            # At most one pending job per target, so concurrent enqueue_match_job() calls
+            # cannot queue duplicates. Coalesce, because NULLs never conflict in a unique
+            # index and pool jobs have neither target. Batch jobs are never coalesced.
+            models.UniqueConstraint(
+                Coalesce("application", Value(0)), Coalesce("scholarship", Value(0)),
+                condition=models.Q(status="pending", application_ids__isnull=True),
+                name="matchjob_unique_pending",
+            ),
+        ]
+
     def __str__(self):
-        return f"Application {self.application.id} -> Scholarship {self.scholarship.id} (Score: {self.score})"
\ No newline at end of file
+        if self.application_id:
+            target = f"Application {self.application_id}"
+        elif self.scholarship_id:
+            target = f"Scholarship {self.scholarship_id}"
+        elif self.application_ids is not None:
+            target = f"{len(self.application_ids)} applications"
+        else:
+            target = "all applications"
+        return f"Match job {self.id} for {target} ({self.status})"
@@ -0,0 +1,23 @@
+# applications/pagination.py
+
+from rest_framework.pagination import CursorPagination
+
+
+class ApplicationCursorPagination(CursorPagination):
+    """
+    Keyset pagination over applications, newest first. The cursor encodes the last
+    submitted_at seen, so every page is an indexed range scan however deep it is.
+
+    Pagination is opt-in: a request without `cursor` or `page_size` gets the plain,
+    unpaginated list that existing clients expect.
+    """
+    ordering = ('-submitted_at', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
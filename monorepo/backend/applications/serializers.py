@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Application
+from .models import Application, MatchJob
 from scholarships.models import Scholarship
 from scholarships.serializers import ScholarshipSerializer
 
@@ -24,6 +24,28 @@ class ApplicationSerializer(serializers.ModelSerializer):
             "applicant": {"read_only": True},
         }
 
+    def __init__(self, *args, **kwargs):
+        # Optional read projection: `fields` limits the top-level fields returned, and
+        # `data_keys` limits the data JSON to those keys, read from the data_key_<n>
+        # annotations added by ApplicationViewSet instead of the full column.
+        fields = kwargs.pop("fields", None)
+        self.data_keys = kwargs.pop("data_keys", None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        if self.data_keys is not None:
+            self.fields.pop("data", None)
+
+    def to_representation(self, instance):
+        ret = super().to_representation(instance)
+        if self.data_keys is not None:
+            values = (getattr(instance, f"data_key_{i}") for i in range(len(self.data_keys)))
+            ret["data"] = {
+                key: value for key, value in zip(self.data_keys, values) if value is not None
+            }
+        return ret
+
     def create(self, validated_data):
         scholarship_id = validated_data.pop("scholarship_id")
         # Look up the actual Scholarship record
@@ -38,4 +60,40 @@ class ApplicationSerializer(serializers.ModelSerializer):
             scholarship=scholarship,
             **validated_data
         )
-        return application
\ No newline at end of file
+        return application
+
+class ApplicationImportRowSerializer(serializers.Serializer):
+    """
+    One row of a bulk import (see applications/importer.py). The applicant is given by
+    ID or username; foreign keys are resolved for the whole batch by the importer.
+    """
+    applicant_id = serializers.IntegerField(required=False)
+    applicant_username = serializers.CharField(required=False)
+    scholarship_id = serializers.IntegerField()
+    data = serializers.DictField()
+    favorited_by_donor = serializers.BooleanField(default=False)
+    awarded = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        if "applicant_id" not in attrs and "applicant_username" not in attrs:
+            raise serializers.ValidationError(
+                "Either applicant_id or applicant_username is required."
+            )
+        return attrs
+
+class MatchJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = MatchJob
+        fields = [
+            "id",
+            "application",
+            "scholarship",
+            "application_ids",
+            "status",
+            "result",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
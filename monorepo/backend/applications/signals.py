@@ -0,0 +1,104 @@
+# monorepo/backend/applications/signals.py
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import Signal, receiver
+
+from scholarships.models import Scholarship
+from .jobs import enqueue_match_job
+from .matching import invalidate_scholarship_index
+from .models import Application
+
+# Sent after a batch of applications is bulk-created by applications/importer.py, since
+# bulk_create() does not send post_save. Receives `count` and `ids`, the new applications'
+# IDs, which are None where the database does not return them from bulk inserts.
+applications_imported = Signal()
+
+# Sent after applications are marked awarded in bulk by applications/allocation.py.
+# Receives `count`.
+applications_awarded = Signal()
+
+# Marker for a field that was deferred when the instance was loaded.
+_UNLOADED = object()
+
+SCHOLARSHIP_MATCH_FIELDS = ('min_gpa', 'allowed_major', 'is_active')
+
+
+def _scholarship_match_state(instance):
+    if any(field not in instance.__dict__ for field in SCHOLARSHIP_MATCH_FIELDS):
+        return _UNLOADED
+    return tuple(instance.__dict__[field] for field in SCHOLARSHIP_MATCH_FIELDS)
+
+
+def _application_match_state(instance):
+    if 'data' not in instance.__dict__:
+        return _UNLOADED
+    data = instance.__dict__['data']
+    if not isinstance(data, dict):
+        return (None, None)
+    return (data.get('gpa'), data.get('major'))
+
+
+def _match_state_changed(instance, state, created):
+    """
+    Compare against the state recorded when the instance was loaded (or last saved).
+    Deferred fields that were never loaded cannot have been changed.
+    """
+    previous = getattr(instance, '_match_state', _UNLOADED)
+    instance._match_state = state
+    if created:
+        return True
+    if state is _UNLOADED:
+        return False
+    return state != previous
+
+
+@receiver(post_init, sender=Scholarship)
+def remember_scholarship_state(sender, instance, **kwargs):
+    instance._match_state = _scholarship_match_state(instance)
+
+
+@receiver(post_init, sender=Application)
+def remember_application_state(sender, instance, **kwargs):
+    instance._match_state = _application_match_state(instance)
+
+
+@receiver(post_save, sender=Scholarship)
+@receiver(post_delete, sender=Scholarship)
+def scholarship_changed(sender, **kwargs):
+    """
+    Drop the cached scholarship index so the next match rebuilds it. It is dropped again on
+    commit in case another request rebuilt it from the pre-commit rows in the meantime.
+    """
+    invalidate_scholarship_index()
+    transaction.on_commit(invalidate_scholarship_index)
+
+
+@receiver(post_save, sender=Scholarship)
+def rematch_changed_scholarship(sender, instance, created, **kwargs):
+    """
+    Queue a re-match of just this scholarship when its matching criteria change.
+    """
+    if _match_state_changed(instance, _scholarship_match_state(instance), created):
+        enqueue_match_job(scholarship=instance)
+
+
+@receiver(post_save, sender=Application)
+def rematch_changed_application(sender, instance, created, **kwargs):
+    """
+    Queue a re-match of just this application when its GPA or major changes.
+    """
+    if _match_state_changed(instance, _application_match_state(instance), created):
+        enqueue_match_job(application=instance)
+
+
+@receiver(applications_imported)
+def rematch_imported_applications(sender, ids, **kwargs):
+    """
+    Queue a re-match of just the imported applications, or of the whole pool when their
+    IDs are unknown.
+    """
+    if None in ids:
+        enqueue_match_job()
+    else:
+        enqueue_match_job(application_ids=ids)
@@ -1,8 +1,29 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from datetime import date, timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
 from rest_framework.test import APITestCase
 from rest_framework import status
 from accounts.models import MyUser
 from scholarships.models import Scholarship
-from .models import Application
+from .models import Application, MatchJob, MatchResult
+from .allocation import MinCostFlow, allocate_awards
+from .jobs import enqueue_match_job, process_pending_jobs
+from .matching import (
+    ScholarshipMatrix,
+    bulk_match_applications,
+    calculate_match_score,
+    get_scholarship_index,
+    rematch_scholarship,
+)
 
 class ApplicationsTestCase(APITestCase):
     def setUp(self):
@@ -68,4 +89,665 @@ class ApplicationsTestCase(APITestCase):
         response = self.client.put(url, update_data, format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         app.refresh_from_db()
-        self.assertEqual(app.data['essay'], 'updated text')
\ No newline at end of file
+        self.assertEqual(app.data['essay'], 'updated text')
+
+    def test_list_nests_scholarships_without_per_row_queries(self):
+        other = Scholarship.objects.create(name='Other', description='d', amount=100)
+        other.bookmarked_by.add(self.user)
+        for scholarship in (self.scholarship, other, other):
+            Application.objects.create(
+                applicant=self.user, scholarship=scholarship, data={'essay': 'x'}
+            )
+        self.client.force_authenticate(self.user)
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/applications/applications/')
+        nested = {row['scholarship']['id']: row['scholarship'] for row in response.data}
+        self.assertTrue(nested[other.id]['is_bookmarked'])
+        self.assertEqual(nested[other.id]['bookmark_count'], 1)
+        self.assertFalse(nested[self.scholarship.id]['is_bookmarked'])
+
+    def test_cursor_pagination_is_opt_in(self):
+        for i in range(5):
+            Application.objects.create(
+                applicant=self.user, scholarship=self.scholarship, data={'n': i}
+            )
+        url = '/api/applications/applications/'
+        self.assertEqual(len(self.client.get(url).data), 5)
+
+        page = self.client.get(url, {'page_size': 2}).data
+        seen = [row['data']['n'] for row in page['results']]
+        while page['next']:
+            page = self.client.get(page['next']).data
+            seen += [row['data']['n'] for row in page['results']]
+        self.assertEqual(seen, [4, 3, 2, 1, 0])
+
+    def test_fields_projection_limits_fields_and_data_keys(self):
+        Application.objects.create(
+            applicant=self.user, scholarship=self.scholarship,
+            data={'major': 'CS', 'gpa': 3.5, 'personal_statement': 'long essay'}
+        )
+        response = self.client.get(
+            '/api/applications/applications/', {'fields': 'id,data.major,data.gpa,data.year'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        row = response.data[0]
+        self.assertEqual(set(row), {'id', 'data'})
+        self.assertEqual(row['data'], {'major': 'CS', 'gpa': 3.5})
+
+    def test_data_columns_stay_in_sync_with_data(self):
+        app = Application.objects.create(
+            applicant=self.user, scholarship=self.scholarship,
+            data={'major': 'CS', 'gpa': '3.4', 'year': 'Junior'}
+        )
+        self.assertEqual((app.major, app.gpa, app.year, app.ethnicity), ('CS', 3.4, 'Junior', ''))
+        app.data = {'major': 'EE', 'gpa': 'n/a'}
+        app.save(update_fields=['data'])
+        app.refresh_from_db()
+        self.assertEqual((app.major, app.gpa, app.year), ('EE', None, ''))
+
+    def test_filter_on_indexed_data_columns(self):
+        for major, gpa, year in [('CS', 3.9, 'Senior'), ('CS', 2.8, 'Junior'), ('EE', 3.5, 'Junior')]:
+            Application.objects.create(
+                applicant=self.user, scholarship=self.scholarship,
+                data={'major': major, 'gpa': gpa, 'year': year}
+            )
+        url = '/api/applications/applications/'
+
+        def majors_gpas(params):
+            response = self.client.get(url, params)
+            return sorted((row['data']['major'], row['data']['gpa']) for row in response.data)
+
+        self.assertEqual(majors_gpas({'gpa__gte': '3.5'}), [('CS', 3.9), ('EE', 3.5)])
+        self.assertEqual(majors_gpas({'major': 'CS', 'gpa__lt': '3'}), [('CS', 2.8)])
+        self.assertEqual(
+            majors_gpas({'year__in': 'Junior,Sophomore'}), [('CS', 2.8), ('EE', 3.5)]
+        )
+        self.assertEqual(majors_gpas({'field': 'major', 'value': 'EE'}), [('EE', 3.5)])
+        self.assertEqual(len(majors_gpas({'gpa__gte': 'high'})), 3)
+
+class MatchingTestCase(TestCase):
+    def setUp(self):
+        self.user = MyUser.objects.create_user(
+            username='matcher',
+            password='matcherpass',
+            email='matcher@example.com'
+        )
+        self.cs_high = Scholarship.objects.create(
+            name='CS High', description='d', amount=1000,
+            min_gpa=3.5, allowed_major='Computer Science'
+        )
+        self.cs_low = Scholarship.objects.create(
+            name='CS Low', description='d', amount=1000,
+            min_gpa=2.0, allowed_major='computer science'
+        )
+        self.eng = Scholarship.objects.create(
+            name='Engineering', description='d', amount=1000,
+            min_gpa=3.0, allowed_major='Engineering'
+        )
+        self.open = Scholarship.objects.create(
+            name='Open', description='d', amount=1000
+        )
+        self.inactive = Scholarship.objects.create(
+            name='Inactive', description='d', amount=1000,
+            min_gpa=1.0, is_active=False
+        )
+        # Drop the re-match jobs queued by creating the scholarships above.
+        MatchJob.objects.all().delete()
+
+    def _application(self, data):
+        return Application.objects.create(
+            applicant=self.user, scholarship=self.open, data=data
+        )
+
+    def test_matrix_agrees_with_calculate_match_score(self):
+        """The bulk engine gives the same scores as the per-pair scorer."""
+        applications = [
+            self._application({'gpa': '3.6', 'major': 'Computer Science'}),
+            self._application({'gpa': 3.0, 'major': 'Electrical Engineering'}),
+            self._application({'gpa': 'n/a', 'major': 'Computer Science'}),
+            self._application({'major': 42}),
+            self._application({}),
+        ]
+        scholarships = Scholarship.objects.all()
+        results = bulk_match_applications(applications, scholarships)
+        for application in applications:
+            expected = [
+                {"scholarship_id": s.id, "score": calculate_match_score(application, s)}
+                for s in scholarships
+                if calculate_match_score(application, s) > 0
+            ]
+            self.assertEqual(results[application.id], expected)
+
+    def test_bulk_match_defaults_to_active_scholarships(self):
+        application = self._application({'gpa': 3.2, 'major': 'Computer Science'})
+        matches = bulk_match_applications([application])[application.id]
+        scores = {m['scholarship_id']: m['score'] for m in matches}
+        self.assertEqual(scores, {self.cs_high.id: 1, self.cs_low.id: 2, self.eng.id: 1})
+
+    def test_match_endpoint_upserts_and_drops_stale_results(self):
+        """Re-running matching replaces scores instead of piling up rows."""
+        application = self._application({'gpa': 3.6, 'major': 'Computer Science'})
+        self.client.force_login(self.user)
+        url = f'/api/applications/match/{application.id}/'
+        self.client.post(url)
+        self.client.post(url)
+        process_pending_jobs(10)
+        self.assertEqual(
+            MatchResult.objects.filter(application=application).count(), 3
+        )
+        application.data = {'gpa': 2.5, 'major': 'History'}
+        application.save()
+        self.client.post(url)
+        process_pending_jobs(10)
+        self.assertEqual(
+            set(MatchResult.objects.filter(application=application)
+                .values_list('scholarship_id', 'score')),
+            {(self.cs_low.id, 1.0)},
+        )
+
+    def test_index_refreshes_when_scholarship_changes(self):
+        application = self._application({'gpa': 1.5, 'major': 'Art History'})
+        self.assertEqual(get_scholarship_index().match(application), [])
+        self.eng.allowed_major = 'History'
+        self.eng.save()
+        self.assertEqual(
+            get_scholarship_index().match(application),
+            [{"scholarship_id": self.eng.id, "score": 1}],
+        )
+        self.eng.delete()
+        self.assertEqual(get_scholarship_index().match(application), [])
+
+    def test_major_index_matches_substrings(self):
+        matrix = ScholarshipMatrix([
+            (1, None, 'Eng'), (2, None, 'engineering'), (3, None, 'EE'), (4, None, 'math'),
+        ])
+        self.assertEqual(
+            sorted(matrix.candidate_majors('electrical engineering')),
+            ['ee', 'eng', 'engineering'],
+        )
+        self.assertEqual(matrix.candidate_majors('applied mathematics'), ['math'])
+        self.assertEqual(matrix.candidate_majors('ee'), ['ee'])
+
+    def test_match_endpoint_queues_job_and_reports_result(self):
+        application = self._application({'gpa': 3.6, 'major': 'Computer Science'})
+        self.client.force_login(self.user)
+        response = self.client.post(f'/api/applications/match/{application.id}/')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job_url = f"/api/applications/match/jobs/{response.data['job_id']}/"
+        self.assertEqual(self.client.get(job_url).data['status'], MatchJob.STATUS_PENDING)
+        self.assertFalse(MatchResult.objects.exists())
+
+        self.assertEqual(process_pending_jobs(10), 1)
+        job = self.client.get(job_url).data
+        self.assertEqual(job['status'], MatchJob.STATUS_DONE)
+        self.assertEqual(len(job['result']['matches']), 3)
+        self.assertEqual(process_pending_jobs(10), 0)
+
+    def test_job_detail_limited_to_owner_and_staff(self):
+        application = self._application({'gpa': 3.6, 'major': 'Computer Science'})
+        job = enqueue_match_job(application=application)
+        job_url = f'/api/applications/match/jobs/{job.id}/'
+        pool_url = f'/api/applications/match/jobs/{enqueue_match_job().id}/'
+
+        self.assertEqual(self.client.get(job_url).status_code, status.HTTP_403_FORBIDDEN)
+        other = MyUser.objects.create_user(
+            username='other', password='pass', email='other@example.com'
+        )
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(job_url).status_code, status.HTTP_404_NOT_FOUND)
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(job_url).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(pool_url).status_code, status.HTTP_404_NOT_FOUND)
+        self.client.force_login(MyUser.objects.create_superuser(
+            username='admin', password='pass', email='admin@example.com'
+        ))
+        self.assertEqual(self.client.get(pool_url).status_code, status.HTTP_200_OK)
+
+    def test_one_pending_job_per_target(self):
+        application = self._application({'gpa': 3.6, 'major': 'Computer Science'})
+        job = enqueue_match_job(application=application)
+        pool_job = enqueue_match_job()
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            MatchJob.objects.create(application=application)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            MatchJob.objects.create()
+        # A conflict on create (as from a concurrent call) returns the pending job.
+        with mock.patch('applications.jobs._pending_job', side_effect=[None, job]):
+            self.assertEqual(enqueue_match_job(application=application), job)
+        self.assertEqual(enqueue_match_job(), pool_job)
+        # Once the job is running, a new one can be queued.
+        process_pending_jobs(10)
+        self.assertNotEqual(enqueue_match_job(application=application), job)
+
+    @override_settings(MATCH_JOB_TIMEOUT=60)
+    def test_stale_running_jobs_fail(self):
+        stale = enqueue_match_job()
+        MatchJob.objects.filter(id=stale.id).update(
+            status=MatchJob.STATUS_RUNNING, started_at=timezone.now() - timedelta(minutes=5)
+        )
+        recent = enqueue_match_job(scholarship=self.eng)
+        MatchJob.objects.filter(id=recent.id).update(
+            status=MatchJob.STATUS_RUNNING, started_at=timezone.now()
+        )
+        self.assertEqual(process_pending_jobs(10), 0)
+        stale.refresh_from_db()
+        recent.refresh_from_db()
+        self.assertEqual(stale.status, MatchJob.STATUS_FAILED)
+        self.assertIsNotNone(stale.finished_at)
+        self.assertEqual(recent.status, MatchJob.STATUS_RUNNING)
+
+    def test_broken_map_fails_claimed_jobs(self):
+        job = enqueue_match_job()
+
+        def broken_map(fn, job_ids):
+            raise RuntimeError('pool broke')
+
+        with self.assertRaises(RuntimeError):
+            process_pending_jobs(10, map_fn=broken_map)
+        job.refresh_from_db()
+        self.assertEqual(job.status, MatchJob.STATUS_FAILED)
+        self.assertIn('pool broke', job.error)
+
+    def test_pool_job_matches_every_application(self):
+        self._application({'gpa': 3.6, 'major': 'Computer Science'})
+        self._application({'gpa': 1.0, 'major': 'Engineering'})
+        job = enqueue_match_job()
+        process_pending_jobs(10)
+        job.refresh_from_db()
+        self.assertEqual(job.status, MatchJob.STATUS_DONE)
+        self.assertEqual(job.result, {"applications": 2, "matches": 4})
+        self.assertEqual(MatchResult.objects.count(), 4)
+
+    def test_scholarship_criteria_change_rematches_only_that_scholarship(self):
+        application = self._application({'gpa': 3.2, 'major': 'Computer Science'})
+        process_pending_jobs(10)
+        before = dict(MatchResult.objects.values_list('scholarship_id', 'score'))
+        self.assertEqual(before, {self.cs_high.id: 1.0, self.cs_low.id: 2.0, self.eng.id: 1.0})
+
+        self.eng.name = 'Renamed'
+        self.eng.save()
+        self.assertFalse(MatchJob.objects.filter(status=MatchJob.STATUS_PENDING).exists())
+
+        self.eng.allowed_major = 'Computer'
+        self.eng.save()
+        job = MatchJob.objects.get(status=MatchJob.STATUS_PENDING)
+        self.assertEqual((job.scholarship_id, job.application_id), (self.eng.id, None))
+        process_pending_jobs(10)
+        after = dict(MatchResult.objects.values_list('scholarship_id', 'score'))
+        self.assertEqual(after, {**before, self.eng.id: 2.0})
+
+        self.eng.is_active = False
+        self.eng.save()
+        process_pending_jobs(10)
+        self.assertFalse(
+            MatchResult.objects.filter(application=application, scholarship=self.eng).exists()
+        )
+
+    def test_rematch_scholarship_scores_like_application_match(self):
+        high = self._application({'gpa': '3.6'})
+        self._application({'gpa': '2.5'})
+        both = self._application({'gpa': 3.1, 'major': 'Civil Engineering'})
+        # Not a string, so no major, although its column holds "['Engineering']".
+        listed = self._application({'gpa': 2.0, 'major': ['Engineering']})
+        process_pending_jobs(10)
+        by_application = dict(MatchResult.objects.filter(scholarship=self.eng)
+                              .values_list('application_id', 'score'))
+        self.assertEqual(by_application, {high.id: 1.0, both.id: 2.0})
+
+        MatchResult.objects.all().delete()
+        rematch_scholarship(self.eng.id)
+        by_scholarship = dict(MatchResult.objects.filter(scholarship=self.eng)
+                              .values_list('application_id', 'score'))
+        self.assertEqual(by_scholarship, by_application)
+        self.assertNotIn(listed.id, by_scholarship)
+
+    def test_application_data_change_rematches_application(self):
+        application = self._application({'gpa': 3.2, 'major': 'History'})
+        process_pending_jobs(10)
+        self.assertEqual(MatchResult.objects.count(), 2)
+
+        application.favorited_by_donor = True
+        application.save()
+        self.assertFalse(MatchJob.objects.filter(status=MatchJob.STATUS_PENDING).exists())
+
+        application.data = {'gpa': 3.2, 'major': 'Engineering', 'essay': 'new'}
+        application.save()
+        self.assertEqual(
+            MatchJob.objects.get(status=MatchJob.STATUS_PENDING).application_id, application.id
+        )
+        process_pending_jobs(10)
+        self.assertEqual(
+            MatchResult.objects.get(scholarship=self.eng).score, 2.0
+        )
+
+    def test_rank_breaks_ties_on_deadline_then_amount(self):
+        matrix = ScholarshipMatrix([
+            (1, None, 'math', date(2030, 1, 1), 500),
+            (2, None, 'math', None, 9000),
+            (3, 2.0, 'math', date(2031, 1, 1), 100),
+            (4, None, 'math', date(2030, 1, 1), 800),
+            (5, None, 'math', date(2030, 1, 1), 800),
+        ])
+        application = Application(data={'gpa': 3.0, 'major': 'Math'})
+        ranked = [m['scholarship_id'] for m in matrix.match(application, top_k=10)]
+        self.assertEqual(ranked, [3, 4, 5, 1, 2])
+        top = matrix.match(application, top_k=2)
+        self.assertEqual(top, [
+            {'scholarship_id': 3, 'score': 2}, {'scholarship_id': 4, 'score': 1},
+        ])
+        self.assertEqual(matrix.match(application, min_score=2), [top[0]])
+
+    @override_settings(MATCH_TOP_K=2)
+    def test_top_k_limits_stored_matches(self):
+        self.cs_low.deadline = date(2030, 1, 1)
+        self.cs_low.save()
+        self.eng.deadline = date(2029, 1, 1)
+        self.eng.save()
+        application = self._application({'gpa': 3.6, 'major': 'Computer Science'})
+        process_pending_jobs(10)
+        # cs_high and cs_low score 2; eng (1) only makes the cut once cs_high stops matching.
+        self.assertEqual(
+            dict(MatchResult.objects.values_list('scholarship_id', 'score')),
+            {self.cs_high.id: 2.0, self.cs_low.id: 2.0},
+        )
+        self.cs_high.min_gpa = 3.9
+        self.cs_high.allowed_major = 'Physics'
+        self.cs_high.save()
+        process_pending_jobs(10)
+        self.assertEqual(
+            dict(MatchResult.objects.filter(application=application)
+                 .values_list('scholarship_id', 'score')),
+            {self.cs_low.id: 2.0, self.eng.id: 1.0},
+        )
+
+
+class ApplicationImportTestCase(APITestCase):
+    def setUp(self):
+        self.admin = MyUser.objects.create_superuser(
+            username='admin', password='adminpass', email='admin@example.com'
+        )
+        self.student = MyUser.objects.create_user(
+            username='student', password='pass', email='student@example.com'
+        )
+        self.scholarship = Scholarship.objects.create(
+            name='Import', description='d', amount=100, min_gpa=3.0
+        )
+        MatchJob.objects.all().delete()
+        self.client.force_authenticate(self.admin)
+        self.url = '/api/applications/import/'
+
+    def _upload(self, name, content, **extra):
+        upload = SimpleUploadedFile(name, content.encode())
+        return self.client.post(self.url, {'file': upload, **extra}, format='multipart')
+
+    def test_ndjson_import_reports_row_errors(self):
+        content = "\n".join([
+            '{"applicant_id": %d, "scholarship_id": %d, "data": {"gpa": "3.6", "major": "CS"}}'
+            % (self.student.id, self.scholarship.id),
+            '{"applicant_username": "student", "scholarship_id": 9999, "data": {}}',
+            'not json',
+            '{"applicant_username": "nobody", "scholarship_id": %d, "data": {}}'
+            % self.scholarship.id,
+            '{"scholarship_id": %d, "data": {}}' % self.scholarship.id,
+        ])
+        # Three batch lookups (scholarships, applicant IDs, usernames), one insert in a
+        # savepoint, and queueing the re-match job.
+        with self.assertNumQueries(7):
+            response = self._upload('applications.ndjson', content)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['rows'], 5)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual([e['row'] for e in response.data['errors']], [2, 3, 4, 5])
+        application = Application.objects.get()
+        self.assertEqual(application.major, 'CS')
+        self.assertEqual(application.gpa, 3.6)
+        # bulk_create() sends no post_save, so the import queues one job for the batch.
+        job = MatchJob.objects.get()
+        self.assertIsNone(job.application_id)
+        self.assertIsNone(job.scholarship_id)
+        self.assertEqual(job.application_ids, [application.id])
+        # Only the imported applications are matched.
+        other = Application.objects.create(
+            applicant=self.student, scholarship=self.scholarship, data={'gpa': '3.9'}
+        )
+        MatchJob.objects.exclude(id=job.id).delete()
+        process_pending_jobs(limit=10)
+        job.refresh_from_db()
+        self.assertEqual(job.status, MatchJob.STATUS_DONE)
+        self.assertEqual(job.result['applications'], 1)
+        self.assertTrue(MatchResult.objects.filter(application=application).exists())
+        self.assertFalse(MatchResult.objects.filter(application=other).exists())
+
+    def test_unreadable_input_stops_with_summary(self):
+        row = ('{"applicant_id": %d, "scholarship_id": %d, "data": {}}'
+               % (self.student.id, self.scholarship.id))
+        upload = SimpleUploadedFile('applications.ndjson', (row + '\n').encode() + b'\xff\n')
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['created'], 1)
+        self.assertIn('after line 1', response.data['error'])
+        self.assertEqual(Application.objects.count(), 1)
+
+        content = (
+            "applicant_username,scholarship_id,essay\n"
+            f"student,{self.scholarship.id},short\n"
+            f"student,{self.scholarship.id},{'x' * 200000}\n"
+        )
+        response = self._upload('applications.csv', content)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(Application.objects.count(), 2)
+
+    def test_csv_dry_run_saves_nothing(self):
+        content = (
+            "applicant_username,scholarship_id,gpa,major,minor\n"
+            f"student,{self.scholarship.id},3.2,Biology,\n"
+        )
+        response = self._upload('applications.csv', content, dry_run='true')
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(response.data['errors'], [])
+        self.assertFalse(Application.objects.exists())
+
+    def test_command_imports_csv(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'applications.csv')
+            with open(path, 'w') as f:
+                f.write('applicant_id,scholarship_id,gpa,major\n')
+                f.write(f'{self.student.id},{self.scholarship.id},3.9,Math\n')
+            out = StringIO()
+            call_command('import_applications', path, stdout=out)
+        self.assertIn('Imported 1 of 1 row(s); 0 skipped.', out.getvalue())
+        self.assertEqual(Application.objects.get().data, {'gpa': '3.9', 'major': 'Math'})
+
+    def test_requires_admin(self):
+        self.client.force_authenticate(self.student)
+        response = self._upload('applications.ndjson', '')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class LoadDataCommandTestCase(TestCase):
+    def test_generate_and_clear(self):
+        call_command(
+            'generate_load_data', users=20, donors=2, scholarships=5, applications=40,
+            bookmarks=2, documents=0, stdout=StringIO(),
+        )
+        self.assertEqual(MyUser.objects.filter(username__startswith='load_').count(), 20)
+        self.assertEqual(Scholarship.objects.count(), 5)
+        self.assertEqual(Application.objects.count(), 40)
+        self.assertEqual(Scholarship.bookmarked_by.through.objects.count(), 36)
+        # bulk_create() bypasses save(), so the command fills the indexed columns itself.
+        application = Application.objects.first()
+        self.assertEqual(application.major, application.data['major'])
+        self.assertEqual(application.gpa, float(application.data['gpa']))
+
+        call_command('generate_load_data', clear=True, stdout=StringIO())
+        self.assertFalse(MyUser.objects.filter(username__startswith='load_').exists())
+        self.assertFalse(Application.objects.exists())
+
+    def test_clear_deletes_only_generated_rows(self):
+        call_command(
+            'generate_load_data', users=10, scholarships=3, applications=10, documents=0,
+            stdout=StringIO(),
+        )
+        kept = Scholarship.objects.create(name='Kept', description='d', amount=100)
+        enqueue_match_job()
+        process_pending_jobs(100)
+        self.assertTrue(MatchResult.objects.exists())
+        call_command('generate_load_data', clear=True, stdout=StringIO())
+        self.assertFalse(Application.objects.exists())
+        self.assertFalse(MatchResult.objects.exists())
+        self.assertFalse(MyUser.objects.filter(username__startswith='load_').exists())
+        self.assertEqual(list(Scholarship.objects.all()), [kept])
+
+    def test_benchmark_reports_query_counts(self):
+        call_command(
+            'generate_load_data', users=10, scholarships=3, applications=10, documents=0,
+            stdout=StringIO(),
+        )
+        out = StringIO()
+        call_command(
+            'benchmark_endpoints', iterations=2, warmup=0,
+            only=['scholarship-list', 'report-available', 'application-list', 'match-application'],
+            stdout=out,
+        )
+        self.assertIn('scholarship-list', out.getvalue())
+        self.assertIn('report-available', out.getvalue())
+        self.assertIn('queries', out.getvalue())
+        # The benchmarked match job ran; nothing else was left running or pending.
+        self.assertFalse(MatchJob.objects.exclude(status=MatchJob.STATUS_DONE).exists())
+
+
+class AwardAllocationTestCase(APITestCase):
+    def setUp(self):
+        self.admin = MyUser.objects.create_superuser(
+            username='admin', password='adminpass', email='admin@example.com'
+        )
+        self.students = [
+            MyUser.objects.create_user(
+                username=f'student{i}', password='pass', email=f'student{i}@example.com'
+            )
+            for i in range(3)
+        ]
+        self.first = Scholarship.objects.create(
+            name='First', description='d', amount=100, quantity=1
+        )
+        self.second = Scholarship.objects.create(
+            name='Second', description='d', amount=100, quantity=1
+        )
+        MatchJob.objects.all().delete()
+
+    def _apply(self, student, scholarship, score, awarded=False):
+        application = Application.objects.create(
+            applicant=student, scholarship=scholarship, data={}, awarded=awarded
+        )
+        MatchResult.objects.create(application=application, scholarship=scholarship, score=score)
+        return application
+
+    def test_beats_greedy_assignment(self):
+        # Awarding the first scholarship to student 0 greedily would leave student 1 with
+        # nothing; the best assignment awards both scholarships.
+        a0_first = self._apply(self.students[0], self.first, 2)
+        a0_second = self._apply(self.students[0], self.second, 2)
+        a1_first = self._apply(self.students[1], self.first, 2)
+
+        awards = allocate_awards()
+
+        self.assertEqual(
+            {award['application_id'] for award in awards}, {a0_second.id, a1_first.id}
+        )
+        self.assertEqual(
+            set(Application.objects.filter(awarded=True).values_list('id', flat=True)),
+            {a0_second.id, a1_first.id},
+        )
+        self.assertFalse(Application.objects.get(id=a0_first.id).awarded)
+
+    def test_respects_quantity_and_prefers_higher_scores(self):
+        self.first.quantity = 2
+        self.first.save()
+        low = self._apply(self.students[0], self.first, 1)
+        high = [self._apply(student, self.first, 2) for student in self.students[1:]]
+
+        awards = allocate_awards()
+
+        self.assertEqual({award['application_id'] for award in awards}, {a.id for a in high})
+        self.assertFalse(Application.objects.get(id=low.id).awarded)
+
+    def test_existing_awards_count_against_quantity(self):
+        self._apply(self.students[0], self.first, 1, awarded=True)
+        self._apply(self.students[1], self.first, 2)
+        # Already awarded elsewhere, so not awarded again.
+        self._apply(self.students[0], self.second, 2)
+
+        self.assertEqual(allocate_awards(), [])
+
+    def test_min_score_and_dry_run(self):
+        self._apply(self.students[0], self.first, 1)
+        application = self._apply(self.students[1], self.second, 2)
+
+        awards = allocate_awards(min_score=2, dry_run=True)
+
+        self.assertEqual([award['application_id'] for award in awards], [application.id])
+        self.assertFalse(Application.objects.filter(awarded=True).exists())
+
+    def test_lock_only_for_saving_runs(self):
+        self._apply(self.students[0], self.first, 2)
+        with mock.patch('applications.allocation.AllocationLock') as lock:
+            allocate_awards(dry_run=True)
+            lock.objects.select_for_update.assert_not_called()
+            allocate_awards()
+            lock.objects.select_for_update.assert_called_once_with()
+
+    def test_view_filters_and_validates_scholarship_ids(self):
+        self._apply(self.students[0], self.first, 2)
+        application = self._apply(self.students[1], self.second, 2)
+        self.client.force_authenticate(self.admin)
+        url = '/api/applications/awards/allocate/'
+
+        response = self.client.post(url, {'scholarship_ids': [self.second.id]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([a['application_id'] for a in response.data['awards']], [application.id])
+        for scholarship_ids in (['x'], [self.first.id, None], [True], self.first.id):
+            response = self.client.post(
+                url, {'scholarship_ids': scholarship_ids}, format='json'
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_solver_finds_best_total(self):
+        # Two scholarships (capacity 1 and 2), three applicants. Giving applicant 0 the first
+        # scholarship scores 3 + 1; the best total is 2 + 3 + 1.
+        weights = {(0, 0): 3, (0, 1): 2, (1, 0): 3, (1, 2): 1}
+        graph = MinCostFlow(7)
+        graph.add_edge(5, 0, 1, 0)
+        graph.add_edge(5, 1, 2, 0)
+        for applicant in range(3):
+            graph.add_edge(2 + applicant, 6, 1, 0)
+        edges = {
+            key: graph.add_edge(key[0], 2 + key[1], 1, 3 - weight)
+            for key, weight in weights.items()
+        }
+        graph.run(5, 6, max_path_cost=3)
+        total = sum(weights[key] for key, edge in edges.items() if graph.flow_on(edge))
+        self.assertEqual(total, 6)
+
+    def test_endpoint(self):
+        application = self._apply(self.students[0], self.first, 2)
+        url = '/api/applications/awards/allocate/'
+
+        self.client.force_authenticate(self.students[0])
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(self.admin)
+        response = self.client.post(url, {'dry_run': True}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 1)
+        self.assertFalse(Application.objects.get(id=application.id).awarded)
+
+        response = self.client.post(
+            url, {'scholarship_ids': [self.first.id]}, format='json'
+        )
+        self.assertEqual(response.data['awards'][0]['application_id'], application.id)
+        self.assertTrue(Application.objects.get(id=application.id).awarded)
+
+        response = self.client.post(url, {'scholarship_ids': 'x'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
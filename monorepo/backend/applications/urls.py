@@ -1,11 +1,20 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ApplicationViewSet, ApplicationMatchingView
+from .views import (
+    ApplicationViewSet,
+    ApplicationImportView,
+    ApplicationMatchingView,
+    AwardAllocationView,
+    MatchJobDetailView,
+)
 
 router = DefaultRouter()
 router.register(r'applications', ApplicationViewSet, basename='application')
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('import/', ApplicationImportView.as_view(), name='application_import'),
+    path('awards/allocate/', AwardAllocationView.as_view(), name='award_allocate'),
     path('match/<int:application_id>/', ApplicationMatchingView.as_view(), name='application_match'),
+    path('match/jobs/<int:job_id>/', MatchJobDetailView.as_view(), name='match_job_detail'),
 ]
\ No newline at end of file
@@ -1,18 +1,49 @@
 # This file contains the models for the accounts app, including a custom user model
-from rest_framework import viewsets, status
+
+from django.db.models import Prefetch
+from django.db.models.fields.json import KeyTransform
+from rest_framework import generics, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import SAFE_METHODS, IsAdminUser, IsAuthenticated
 from rest_framework.views import APIView
 
-from .models import Application, MatchResult
-from .serializers import ApplicationSerializer
-from .matching import match_applications_to_scholarships
+from .models import Application, MatchJob
+from .serializers import ApplicationSerializer, MatchJobSerializer
+from .jobs import enqueue_match_job
+from .importer import (
+    IMPORT_FORMATS, decode_lines, guess_format, import_applications, read_records,
+)
+from .allocation import allocate_awards
+from .pagination import ApplicationCursorPagination
 from scholarships.models import Scholarship
 
 # 1) Import the custom permission
 from .permissions import IsApplicantOrAdmin
 
 
+# Denormalized Application columns that can be filtered on, and the lookups allowed for each.
+DATA_COLUMN_FILTERS = {
+    "major": ("exact", "in"),
+    "year": ("exact", "in"),
+    "student_id": ("exact", "in"),
+    "ethnicity": ("exact", "in"),
+    "gpa": ("exact", "in", "gt", "gte", "lt", "lte"),
+}
+
+
+def _parse_filter_value(field, lookup, raw):
+    """
+    Convert a query-string value for a DATA_COLUMN_FILTERS lookup. `in` takes a
+    comma-separated list. Raises ValueError for a non-numeric GPA.
+    """
+    convert = float if field == "gpa" else str
+    if lookup == "in":
+        return [convert(part.strip()) for part in raw.split(",") if part.strip()]
+    return convert(raw)
+
+
 class ApplicationViewSet(viewsets.ModelViewSet):
     serializer_class = ApplicationSerializer
     queryset = Application.objects.all()
@@ -20,8 +51,54 @@ class ApplicationViewSet(viewsets.ModelViewSet):
     # 2) Use our custom permission (remove or comment out the old get_permissions method).
     permission_classes = [IsApplicantOrAdmin]
 
+    pagination_class = ApplicationCursorPagination
+
+    def get_projection(self):
+        """
+        Parse ?fields=id,scholarship,data.major,data.gpa into (fields, data_keys).
+        `fields` is the set of top-level fields to return (None for all); `data_keys` is
+        the list of data JSON keys to return (None for the whole JSON). Only applies to
+        reads.
+        """
+        param = self.request.query_params.get("fields")
+        if not param or self.request.method not in SAFE_METHODS:
+            return None, None
+        fields = set()
+        data_keys = []
+        for name in (part.strip() for part in param.split(",")):
+            if name.startswith("data."):
+                data_keys.append(name[len("data."):])
+                fields.add("data")
+            elif name:
+                fields.add(name)
+        return fields, (data_keys or None)
+
+    def get_serializer(self, *args, **kwargs):
+        fields, data_keys = self.get_projection()
+        if fields is not None:
+            kwargs["fields"] = fields
+        if data_keys is not None:
+            kwargs["data_keys"] = data_keys
+        return super().get_serializer(*args, **kwargs)
+
     def get_queryset(self):
         qs = Application.objects.all()
+        fields, data_keys = self.get_projection()
+        if fields is None or "scholarship" in fields:
+            # Load the nested scholarships, with their bookmark annotations, in one extra query.
+            qs = qs.prefetch_related(
+                Prefetch(
+                    "scholarship",
+                    queryset=Scholarship.objects.with_bookmark_info(self.request.user),
+                )
+            )
+        if data_keys is not None:
+            # Pull just the requested keys out of the JSON in the database.
+            qs = qs.defer("data").annotate(**{
+                f"data_key_{i}": KeyTransform(key, "data") for i, key in enumerate(data_keys)
+            })
+        elif fields is not None and "data" not in fields:
+            qs = qs.defer("data")
         # Filter by scholarship if provided.
         scholarship = self.request.query_params.get("scholarship")
         if scholarship:
@@ -29,11 +106,30 @@ class ApplicationViewSet(viewsets.ModelViewSet):
                 qs = qs.filter(scholarship_id=int(scholarship))
             except ValueError:
                 pass
+        # Filter on the indexed copies of common data keys, e.g. ?major=CS,
+        # ?year__in=Junior,Senior or ?gpa__gte=3.5.
+        for field, lookups in DATA_COLUMN_FILTERS.items():
+            for lookup in lookups:
+                param = field if lookup == "exact" else f"{field}__{lookup}"
+                raw = self.request.query_params.get(param)
+                if raw is None:
+                    continue
+                try:
+                    value = _parse_filter_value(field, lookup, raw)
+                except ValueError:
+                    continue
+                qs = qs.filter(**{param: value})
         # Filter by application response field (assume stored in 'data')
         field = self.request.query_params.get("field")
         value = self.request.query_params.get("value")
         if field and value:
-            qs = qs.filter(data__contains={field: value})
+            if field in DATA_COLUMN_FILTERS:
+                try:
+                    qs = qs.filter(**{field: _parse_filter_value(field, "exact", value)})
+                except ValueError:
+                    pass
+            else:
+                qs = qs.filter(data__contains={field: value})
         return qs
 
     def perform_create(self, serializer):
@@ -65,8 +161,9 @@ class ApplicationViewSet(viewsets.ModelViewSet):
 
 class ApplicationMatchingView(APIView):
     """
-    For a given application (by ID), runs the matching algorithm across all scholarships 
-    and stores the results in MatchResult.
+    Queues a matching run for the given application (by ID) and returns the job ID
+    immediately. The run_match_worker command scores it against all active scholarships
+    and stores the results in MatchResult; poll MatchJobDetailView for the outcome.
     """
     def post(self, request, application_id):
         try:
@@ -74,14 +171,86 @@ class ApplicationMatchingView(APIView):
         except Application.DoesNotExist:
             return Response({"error": "Application not found."},
                             status=status.HTTP_404_NOT_FOUND)
-        
+
+        job = enqueue_match_job(application=application, requested_by=request.user)
+        return Response({"job_id": job.id, "status": job.status},
+                        status=status.HTTP_202_ACCEPTED)
+
+
+class ApplicationImportView(APIView):
+    """
+    Bulk-imports applications from an uploaded NDJSON or CSV file (multipart field
+    "file"). The format comes from the "format" field or the file extension; pass
+    "dry_run=true" to validate without saving. Rows that fail validation are skipped and
+    reported by line number. Unreadable input (not UTF-8, malformed CSV) stops the import
+    with a 400 whose summary covers the rows imported before it.
+    """
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"error": "Missing 'file' upload."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        format = request.data.get("format") or guess_format(upload.name)
+        if format not in IMPORT_FORMATS:
+            return Response({"error": f"Unsupported format '{format}'."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        dry_run = str(request.data.get("dry_run", "")).lower() in ("true", "1")
+        summary = import_applications(
+            read_records(decode_lines(upload.file), format), dry_run=dry_run
+        )
+        if summary["error"] is not None:
+            return Response(summary, status=status.HTTP_400_BAD_REQUEST)
+        return Response(summary, status=status.HTTP_200_OK)
+
+
+class AwardAllocationView(APIView):
+    """
+    Awards scholarships in bulk from the stored match scores, maximizing the total score
+    without exceeding any scholarship's quantity or awarding an applicant twice.
+    Accepts JSON: { "dry_run": true, "scholarship_ids": [...], "min_score": 1 }, all
+    optional; a dry run returns the proposed awards without saving them.
+    """
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
         scholarships = Scholarship.objects.all()
-        match_results = match_applications_to_scholarships(application, scholarships)
-        
-        for match in match_results:
-            MatchResult.objects.create(
-                application=application,
-                scholarship_id=match['scholarship_id'],
-                score=match['score']
-            )
-        return Response({"matches": match_results}, status=status.HTTP_200_OK)
\ No newline at end of file
+        scholarship_ids = request.data.get("scholarship_ids")
+        if scholarship_ids is not None:
+            if not isinstance(scholarship_ids, list) or not all(
+                isinstance(i, int) and not isinstance(i, bool) for i in scholarship_ids
+            ):
+                return Response({"error": "'scholarship_ids' must be a list of integers."},
+                                status=status.HTTP_400_BAD_REQUEST)
+            scholarships = scholarships.filter(id__in=scholarship_ids)
+        try:
+            min_score = float(request.data.get("min_score", 1))
+        except (TypeError, ValueError):
+            return Response({"error": "'min_score' must be a number."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        dry_run = str(request.data.get("dry_run", "")).lower() in ("true", "1")
+        awards = allocate_awards(scholarships, min_score=min_score, dry_run=dry_run)
+        return Response({
+            "dry_run": dry_run,
+            "count": len(awards),
+            "total_score": sum(award["score"] for award in awards),
+            "awards": awards,
+        }, status=status.HTTP_200_OK)
+
+
+class MatchJobDetailView(generics.RetrieveAPIView):
+    """
+    Returns the status of a queued match job, and its matches once it is done.
+    Applicants see jobs for their own applications only; staff see every job.
+    """
+    serializer_class = MatchJobSerializer
+    permission_classes = [IsAuthenticated]
+    lookup_url_kwarg = 'job_id'
+
+    def get_queryset(self):
+        jobs = MatchJob.objects.all()
+        if self.request.user.is_staff:
+            return jobs
+        return jobs.filter(application__applicant=self.request.user)
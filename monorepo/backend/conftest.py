@@ -0,0 +1,14 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def report_snapshot_dir(settings, tmp_path):
+    # Keep report snapshots written during tests out of the source tree.
+    settings.REPORT_SNAPSHOT_DIR = str(tmp_path / 'report_snapshots')
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # The local-memory cache outlives each test's database rollback.
+    from django.core.cache import cache
+    cache.clear()
@@ -0,0 +1,129 @@
+# documents/downloads.py
+#
+# File delivery for document downloads. With DOCUMENT_DOWNLOAD_MODE set to
+# 'x-accel-redirect' (nginx) or 'x-sendfile' (Apache/lighttpd), the response only names
+# the file and the front proxy sends the bytes, including any Range handling. In the
+# default 'django' mode the file is served here with Range and conditional-GET support,
+# in fixed-size blocks (or through the server's wsgi.file_wrapper for whole files).
+
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+BLOCK_SIZE = 64 * 1024
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def _etag(stat):
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def parse_range(header, size):
+    """
+    Parse a single-range Range header into an inclusive (start, end) pair. Returns None
+    when the whole file should be sent (no header, a malformed one, or several ranges)
+    and 'unsatisfiable' when the range lies outside the file.
+    """
+    match = _RANGE_RE.match(header.strip()) if header else None
+    if match is None:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        # Suffix range: the last `end` bytes.
+        length = int(end)
+        if length == 0:
+            return 'unsatisfiable'
+        return max(0, size - length), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        return 'unsatisfiable'
+    return start, end
+
+
+def _if_range_matches(request, etag, last_modified):
+    """An If-Range header that no longer matches means the client needs the whole file."""
+    if_range = request.headers.get('If-Range')
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == etag
+    since = parse_http_date_safe(if_range)
+    return since is not None and int(last_modified) <= since
+
+
+def _file_range(path, start, end):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            block = f.read(min(BLOCK_SIZE, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
+
+
+def serve_file(request, path, name, filename):
+    """
+    Return a download response for the file at absolute `path`, stored under the relative
+    storage `name`, offered to the client as `filename`.
+    """
+    stat = os.stat(path)
+    etag = _etag(stat)
+    last_modified = stat.st_mtime
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified)
+    )
+    if response is None:
+        response = _file_response(request, path, name, stat, etag, last_modified)
+        response['Content-Disposition'] = content_disposition_header(True, filename)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    # Documents are per user, so shared caches must not keep them.
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def _file_response(request, path, name, stat, etag, last_modified):
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    mode = settings.DOCUMENT_DOWNLOAD_MODE
+    if mode == 'x-accel-redirect':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = quote(
+            settings.DOCUMENT_ACCEL_REDIRECT_PREFIX.rstrip('/') + '/' + name
+        )
+        return response
+    if mode == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = path
+        return response
+
+    size = stat.st_size
+    byte_range = None
+    if _if_range_matches(request, etag, last_modified):
+        byte_range = parse_range(request.headers.get('Range'), size)
+    if byte_range == 'unsatisfiable':
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+    elif byte_range is not None:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _file_range(path, start, end), status=206, content_type=content_type
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+    else:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+        response.block_size = BLOCK_SIZE
+    response['Accept-Ranges'] = 'bytes'
+    return response
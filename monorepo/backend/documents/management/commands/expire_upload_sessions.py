@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from documents.uploads import expire_upload_sessions
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes chunked uploads not written to for UPLOAD_SESSION_EXPIRY seconds, with "
+        "their partial files. Run it periodically, e.g. from cron."
+    )
+
+    def handle(self, *args, **options):
+        count = expire_upload_sessions()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {count} expired upload(s)."))
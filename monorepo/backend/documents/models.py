@@ -1,3 +1,5 @@
+import uuid
+
 from django.db import models
 from accounts.models import MyUser
 
@@ -10,4 +12,21 @@ class Document(models.Model):
     uploaded_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
-        return f"{self.user.username} - {self.file.name}"
\ No newline at end of file
+        return f"{self.user.username} - {self.file.name}"
+
+class UploadSession(models.Model):
+    """
+    A resumable chunked upload in progress (see documents/uploads.py). Chunks are written
+    to a partial file beside the document's final location; finalizing it creates the
+    Document and deletes the session.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(MyUser, on_delete=models.CASCADE)
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    received = models.BigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user_id} - {self.filename} ({self.received}/{self.size})"
@@ -1,5 +1,9 @@
+import os
+
+from django.conf import settings
+from django.utils.text import get_valid_filename
 from rest_framework import serializers
-from .models import Document
+from .models import Document, UploadSession
 
 class DocumentSerializer(serializers.ModelSerializer):
     class Meta:
@@ -7,4 +11,25 @@ class DocumentSerializer(serializers.ModelSerializer):
         fields = "__all__"
         extra_kwargs = {
             'user': {'read_only': True}  # Mark the user field as read-only.
-        }
\ No newline at end of file
+        }
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UploadSession
+        fields = ["id", "filename", "size", "received", "created_at"]
+        read_only_fields = ["id", "received", "created_at"]
+
+    def validate_filename(self, value):
+        name = get_valid_filename(os.path.basename(value))
+        if not name:
+            raise serializers.ValidationError("Invalid file name.")
+        return name
+
+    def validate_size(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("Size must be positive.")
+        if value > settings.DOCUMENT_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(
+                f"Files may be at most {settings.DOCUMENT_UPLOAD_MAX_SIZE} bytes."
+            )
+        return value
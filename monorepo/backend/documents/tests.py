@@ -1,3 +1,256 @@
-from django.test import TestCase
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import MyUser
+from .models import Document, UploadSession
+from .uploads import UploadError, finalize_upload
+
+
+class ChunkedUploadTestCase(APITestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.user = MyUser.objects.create_user(
+            username='student', password='pass', email='student@example.com'
+        )
+        self.client.force_authenticate(self.user)
+        self.content = os.urandom(200 * 1024)
+
+    def _start(self, filename='transcript.pdf'):
+        response = self.client.post(
+            '/api/documents/uploads/',
+            {'filename': filename, 'size': len(self.content)}, format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return f"/api/documents/uploads/{response.data['id']}/"
+
+    def _put(self, url, offset, chunk):
+        return self.client.generic(
+            'PUT', url, chunk, content_type='application/octet-stream',
+            HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    def _finalize(self, url, content):
+        return self.client.post(
+            url + 'finalize/', {'sha256': hashlib.sha256(content).hexdigest()}, format='json'
+        )
+
+    def test_resumable_upload_creates_document(self):
+        url = self._start()
+        self.assertEqual(self._put(url, 0, self.content[:80000]).data['received'], 80000)
+        # Resending from a stale offset is rejected with the offset to resume from.
+        response = self._put(url, 0, self.content[:80000])
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['received'], 80000)
+        self.assertEqual(self.client.get(url).data['received'], 80000)
+        self._put(url, 80000, self.content[80000:])
+
+        response = self._finalize(url, self.content)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        document = Document.objects.get(user=self.user)
+        self.assertEqual(document.file.name, f'documents/user_{self.user.id}/transcript.pdf')
+        with document.file.open('rb') as f:
+            self.assertEqual(f.read(), self.content)
+        self.assertFalse(UploadSession.objects.exists())
+        self.assertEqual(os.listdir(os.path.dirname(document.file.path)), ['transcript.pdf'])
+
+    def test_checksum_mismatch_restarts_session(self):
+        url = self._start()
+        self._put(url, 0, self.content)
+        response = self._finalize(url, b'something else')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['received'], 0)
+        self.assertFalse(Document.objects.exists())
+
+    def test_chunk_past_declared_size_rejected(self):
+        url = self._start()
+        response = self._put(url, 0, self.content + b'extra')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['received'], 0)
+
+    def test_chunk_needs_valid_content_length(self):
+        url = self._start()
+        for content_length, expected in (('', status.HTTP_411_LENGTH_REQUIRED),
+                                         ('abc', status.HTTP_400_BAD_REQUEST),
+                                         ('-5', status.HTTP_400_BAD_REQUEST)):
+            response = self.client.generic(
+                'PUT', url, self.content[:1000], content_type='application/octet-stream',
+                HTTP_UPLOAD_OFFSET='0', CONTENT_LENGTH=content_length,
+            )
+            self.assertEqual(response.status_code, expected)
+        self.assertEqual(UploadSession.objects.get().received, 0)
+
+    def test_other_users_cannot_touch_session(self):
+        url = self._start()
+        other = MyUser.objects.create_user(
+            username='other', password='pass', email='other@example.com'
+        )
+        self.client.force_authenticate(other)
+        self.assertEqual(self._put(url, 0, self.content).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_abort_removes_partial_file(self):
+        url = self._start()
+        self._put(url, 0, self.content[:1000])
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(UploadSession.objects.exists())
+        directory = os.path.join(self.media_root, 'documents', f'user_{self.user.id}')
+        self.assertEqual(os.listdir(directory), [])
+
+    def test_finalize_twice_conflicts(self):
+        url = self._start()
+        self._put(url, 0, self.content)
+        session = UploadSession.objects.get()
+        stale = UploadSession.objects.get()
+        sha256 = hashlib.sha256(self.content).hexdigest()
+        finalize_upload(session, self.user, sha256)
+        # A second call holding the same session finds it already finalized.
+        with self.assertRaises(UploadError):
+            finalize_upload(stale, self.user, sha256)
+        self.assertEqual(Document.objects.count(), 1)
+
+    def test_finalize_keeps_existing_file(self):
+        directory = os.path.join(self.media_root, 'documents', f'user_{self.user.id}')
+        os.makedirs(directory)
+        with open(os.path.join(directory, 'transcript.pdf'), 'wb') as f:
+            f.write(b'existing')
+        url = self._start()
+        self._put(url, 0, self.content)
+        response = self._finalize(url, self.content)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        document = Document.objects.get()
+        self.assertNotEqual(document.file.name, f'documents/user_{self.user.id}/transcript.pdf')
+        with open(os.path.join(directory, 'transcript.pdf'), 'rb') as f:
+            self.assertEqual(f.read(), b'existing')
+        self.assertEqual(len(os.listdir(directory)), 2)
+
+    def test_finalize_retries_name_taken_after_check(self):
+        directory = os.path.join(self.media_root, 'documents', f'user_{self.user.id}')
+        os.makedirs(directory)
+        with open(os.path.join(directory, 'transcript.pdf'), 'wb') as f:
+            f.write(b'existing')
+        url = self._start()
+        self._put(url, 0, self.content)
+        storage = Document._meta.get_field('file').storage
+        # The first name is reported available, as if the file appeared just after.
+        names = [f'documents/user_{self.user.id}/transcript.pdf',
+                 f'documents/user_{self.user.id}/transcript_2.pdf']
+        with mock.patch.object(storage, 'get_available_name', side_effect=names):
+            response = self._finalize(url, self.content)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Document.objects.get().file.name, names[1])
+        with open(os.path.join(directory, 'transcript.pdf'), 'rb') as f:
+            self.assertEqual(f.read(), b'existing')
+
+    def test_missing_partial_file_conflicts(self):
+        url = self._start()
+        self._put(url, 0, self.content)
+        directory = os.path.join(self.media_root, 'documents', f'user_{self.user.id}')
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+        response = self._finalize(url, self.content)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    @override_settings(UPLOAD_SESSION_EXPIRY=3600)
+    def test_expire_upload_sessions(self):
+        stale_url = self._start('stale.pdf')
+        self._put(stale_url, 0, self.content[:1000])
+        UploadSession.objects.update(updated_at=timezone.now() - timedelta(hours=2))
+        self._start('fresh.pdf')
+
+        out = StringIO()
+        call_command('expire_upload_sessions', stdout=out)
+
+        self.assertIn('Deleted 1 expired upload(s).', out.getvalue())
+        self.assertEqual(list(UploadSession.objects.values_list('filename', flat=True)),
+                         ['fresh.pdf'])
+        directory = os.path.join(self.media_root, 'documents', f'user_{self.user.id}')
+        self.assertEqual(len(os.listdir(directory)), 1)
+        self.assertEqual(self.client.get(stale_url).status_code, status.HTTP_404_NOT_FOUND)
+
+
+class DocumentDownloadTestCase(APITestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.user = MyUser.objects.create_user(
+            username='student', password='pass', email='student@example.com'
+        )
+        self.client.force_login(self.user)
+        self.content = bytes(range(256)) * 4
+        self.document = Document(user=self.user)
+        self.document.file.save('letter.pdf', ContentFile(self.content))
+        self.url = f'/api/documents/download/{self.document.id}/'
+
+    def test_full_download_with_validators(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('attachment; filename="letter.pdf"', response['Content-Disposition'])
+        self.assertIn('private', response['Cache-Control'])
+
+        cached = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        cached = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(cached.status_code, 304)
+
+    def test_range_requests(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), self.content[10:20])
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.content)}')
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-5')
+        self.assertEqual(b''.join(response.streaming_content), self.content[-5:])
+
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={len(self.content)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.content)}')
+
+        # A stale If-Range validator gets the whole, current file.
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(
+        DOCUMENT_DOWNLOAD_MODE='x-accel-redirect',
+        DOCUMENT_ACCEL_REDIRECT_PREFIX='/protected-documents/',
+    )
+    def test_accel_redirect_hands_file_to_proxy(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(
+            response['X-Accel-Redirect'],
+            f'/protected-documents/documents/user_{self.user.id}/letter.pdf',
+        )
+        self.assertIn('ETag', response)
+
+    @override_settings(DOCUMENT_DOWNLOAD_MODE='x-sendfile')
+    def test_sendfile_hands_file_to_proxy(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Sendfile'], self.document.file.path)
+
+    def test_other_users_cannot_download(self):
+        other = MyUser.objects.create_user(
+            username='other', password='pass', email='other@example.com'
+        )
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
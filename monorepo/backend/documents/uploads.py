@@ -0,0 +1,168 @@
+# documents/uploads.py
+#
+# Resumable chunked uploads. A client opens an UploadSession with the file's name and
+# size, PUTs the bytes in chunks (each tagged with the offset it starts at, so a dropped
+# connection resumes from the last acknowledged byte), and finalizes with the file's
+# SHA-256. Chunks are streamed from the request to a partial file in the document's
+# upload_to directory in fixed-size blocks, so memory use does not depend on the file or
+# chunk size, and finalizing links the file to its final name on the same filesystem.
+# Sessions left untouched for UPLOAD_SESSION_EXPIRY seconds are deleted, with their
+# partial files, by the expire_upload_sessions management command.
+
+import hashlib
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Document, UploadSession, upload_to
+
+# Bytes read from the request or the partial file at a time.
+STREAM_BLOCK_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    """Raised when a chunk or finalize request does not fit the session's state."""
+
+
+def _storage():
+    return Document._meta.get_field("file").storage
+
+
+def part_path(session, user):
+    """Absolute path of the session's partial file."""
+    directory = os.path.dirname(upload_to(Document(user=user), session.filename))
+    return _storage().path(os.path.join(directory, f".upload-{session.id}.part"))
+
+
+def start_upload(session, user):
+    """Create the empty partial file for a newly saved session."""
+    path = part_path(session, user)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "wb").close()
+
+
+def append_chunk(session, user, offset, stream, length):
+    """
+    Write `length` bytes read from `stream` at `offset`, which must be the number of bytes
+    received so far. Anything past the end of the chunk (left by an earlier attempt that
+    was cut off) is discarded. Returns the new received count.
+    """
+    if offset != session.received:
+        raise UploadError(f"Expected offset {session.received}.")
+    if length > session.size - offset:
+        raise UploadError("Chunk extends past the declared file size.")
+    written = 0
+    with open(part_path(session, user), "r+b") as f:
+        f.seek(offset)
+        while written < length:
+            block = stream.read(min(STREAM_BLOCK_SIZE, length - written))
+            if not block:
+                break
+            f.write(block)
+            written += len(block)
+        f.truncate()
+    if written != length:
+        raise UploadError("Chunk ended early; resend it from the same offset.")
+    # Conditional update, so of two concurrent requests for the same offset only one counts.
+    updated = UploadSession.objects.filter(id=session.id, received=offset).update(
+        received=offset + written, updated_at=timezone.now()
+    )
+    if not updated:
+        raise UploadError("Another chunk was written at this offset; check the offset.")
+    session.received = offset + written
+    return session.received
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(STREAM_BLOCK_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _link_available_name(path, name):
+    """
+    Give the file at `path` the first available storage name based on `name`, and return
+    that name. Unlike a rename, link() fails rather than replace a file that took the name
+    after it was found available, so the next name is tried.
+    """
+    storage = _storage()
+    while True:
+        name = storage.get_available_name(name)
+        try:
+            os.link(path, storage.path(name))
+        except FileExistsError:
+            continue
+        os.remove(path)
+        return name
+
+
+def finalize_upload(session, user, sha256):
+    """
+    Verify the complete file against `sha256`, move it to its final name and return the
+    new Document. The session is deleted. The session row stays locked meanwhile, so of
+    concurrent calls for one session, the later ones find it gone.
+    """
+    with transaction.atomic():
+        locked = UploadSession.objects.select_for_update().filter(id=session.id).first()
+        if locked is None:
+            raise UploadError("The upload was already finalized or aborted.")
+        session.received = locked.received
+        if session.received != session.size:
+            raise UploadError(f"Only {session.received} of {session.size} bytes received.")
+        path = part_path(session, user)
+        try:
+            checksum_matches = _sha256(path) == sha256.lower()
+        except FileNotFoundError:
+            raise UploadError("The partial file is gone; start a new upload.")
+        if checksum_matches:
+            document = Document(user=user)
+            document.file.name = _link_available_name(
+                path, upload_to(document, session.filename)
+            )
+            document.save()
+            session.delete()
+            return document
+        # The bytes cannot be trusted, so the session starts over from offset 0.
+        open(path, "wb").close()
+        UploadSession.objects.filter(id=session.id).update(
+            received=0, updated_at=timezone.now()
+        )
+        session.received = 0
+    raise UploadError("Checksum mismatch; upload the file again from offset 0.")
+
+
+def abort_upload(session, user):
+    """Delete the session and its partial file."""
+    try:
+        os.remove(part_path(session, user))
+    except FileNotFoundError:
+        pass
+    session.delete()
+
+
+def expire_upload_sessions():
+    """
+    Delete the sessions not written to for UPLOAD_SESSION_EXPIRY seconds, and their
+    partial files. Returns the number deleted.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.UPLOAD_SESSION_EXPIRY)
+    expired = UploadSession.objects.filter(updated_at__lt=cutoff).select_related("user")
+    count = 0
+    for session in expired.iterator():
+        # Conditional delete, in case a chunk arrived since the query.
+        deleted, _ = UploadSession.objects.filter(
+            id=session.id, updated_at__lt=cutoff
+        ).delete()
+        if not deleted:
+            continue
+        try:
+            os.remove(part_path(session, session.user))
+        except FileNotFoundError:
+            pass
+        count += 1
+    return count
@@ -1,9 +1,21 @@
 from django.urls import path
-from .views import DocumentUploadView, DocumentListView, DocumentDetailView, download_document
+from .views import (
+    DocumentUploadView,
+    DocumentListView,
+    DocumentDetailView,
+    UploadSessionCreateView,
+    UploadSessionDetailView,
+    UploadSessionFinalizeView,
+    download_document,
+)
 
 urlpatterns = [
     path('upload/', DocumentUploadView.as_view(), name='document_upload'),
     path('', DocumentListView.as_view(), name='document_list'),
     path('<int:pk>/', DocumentDetailView.as_view(), name='document_detail'),
     path('download/<int:pk>/', download_document, name='document_download'),
+    path('uploads/', UploadSessionCreateView.as_view(), name='upload_session_create'),
+    path('uploads/<uuid:session_id>/', UploadSessionDetailView.as_view(), name='upload_session_detail'),
+    path('uploads/<uuid:session_id>/finalize/', UploadSessionFinalizeView.as_view(),
+         name='upload_session_finalize'),
 ]
\ No newline at end of file
@@ -1,10 +1,14 @@
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from django.http import FileResponse, Http404
+from rest_framework.views import APIView
+from django.http import Http404
+from django.shortcuts import get_object_or_404
 import os
-from .models import Document
-from .serializers import DocumentSerializer
+from .models import Document, UploadSession
+from .serializers import DocumentSerializer, UploadSessionSerializer
+from . import uploads
+from .downloads import serve_file
 
 # Create document (upload)
 class DocumentUploadView(generics.CreateAPIView):
@@ -16,6 +20,78 @@ class DocumentUploadView(generics.CreateAPIView):
         # Automatically assign the current authenticated user.
         serializer.save(user=self.request.user)
 
+# Resumable chunked upload (see documents/uploads.py):
+#   POST   uploads/                  {"filename", "size"} -> session with "id" and "received"
+#   PUT    uploads/<id>/             raw bytes, with an Upload-Offset header
+#   GET    uploads/<id>/             current "received" offset, to resume after a failure
+#   POST   uploads/<id>/finalize/    {"sha256"} -> the created document
+#   DELETE uploads/<id>/             abandon the upload
+class UploadSessionCreateView(generics.CreateAPIView):
+    serializer_class = UploadSessionSerializer
+    permission_classes = [IsAuthenticated]
+
+    def perform_create(self, serializer):
+        session = serializer.save(user=self.request.user)
+        uploads.start_upload(session, self.request.user)
+
+def _upload_conflict(session, error):
+    return Response({"error": str(error), "received": session.received},
+                    status=status.HTTP_409_CONFLICT)
+
+class UploadSessionDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get_session(self, request, session_id):
+        return get_object_or_404(UploadSession, id=session_id, user=request.user)
+
+    def get(self, request, session_id):
+        session = self.get_session(request, session_id)
+        return Response(UploadSessionSerializer(session).data)
+
+    def put(self, request, session_id):
+        session = self.get_session(request, session_id)
+        try:
+            offset = int(request.headers["Upload-Offset"])
+        except (KeyError, ValueError):
+            return Response({"error": "An integer Upload-Offset header is required."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        # Without a length (chunked transfer-encoding), the chunk cannot be read.
+        if not request.META.get("CONTENT_LENGTH"):
+            return Response({"error": "A Content-Length header is required."},
+                            status=status.HTTP_411_LENGTH_REQUIRED)
+        try:
+            length = int(request.META["CONTENT_LENGTH"])
+        except ValueError:
+            length = -1
+        if length < 0:
+            return Response({"error": "Invalid Content-Length header."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            # request.stream reads the body straight from the connection, unbuffered.
+            uploads.append_chunk(session, request.user, offset, request.stream, length)
+        except uploads.UploadError as e:
+            return _upload_conflict(session, e)
+        return Response({"received": session.received})
+
+    def delete(self, request, session_id):
+        uploads.abort_upload(self.get_session(request, session_id), request.user)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class UploadSessionFinalizeView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, session_id):
+        session = get_object_or_404(UploadSession, id=session_id, user=request.user)
+        sha256 = request.data.get("sha256")
+        if not sha256:
+            return Response({"error": "Missing 'sha256' field."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            document = uploads.finalize_upload(session, request.user, sha256)
+        except uploads.UploadError as e:
+            return _upload_conflict(session, e)
+        return Response(DocumentSerializer(document).data, status=status.HTTP_201_CREATED)
+
 # List documents for the authenticated user.
 class DocumentListView(generics.ListAPIView):
     serializer_class = DocumentSerializer
@@ -34,7 +110,8 @@ class DocumentDetailView(generics.RetrieveDestroyAPIView):
         # Ensure a user can only retrieve or delete their own documents.
         return Document.objects.filter(user=self.request.user)
 
-# Custom view to force file download.
+# Custom view to force file download. Delivery (proxy offload, Range requests, ETags)
+# is handled by documents/downloads.py.
 def download_document(request, pk):
     if not request.user.is_authenticated:
         raise Http404("User not authenticated")
@@ -45,5 +122,7 @@ def download_document(request, pk):
     
     file_path = document.file.path
     filename = os.path.basename(file_path)
-    # Force the file to download by setting as_attachment=True.
-    return FileResponse(open(file_path, 'rb'), as_attachment=True, filename=filename)
\ No newline at end of file
+    try:
+        return serve_file(request, file_path, document.file.name, filename)
+    except FileNotFoundError:
+        raise Http404("Document file not found")
@@ -0,0 +1,17 @@
+# mybackend/caching.py
+
+from django.conf import settings
+
+
+def invalidated_timeout(timeout):
+    """
+    Timeout for a cache entry that is deleted when its data changes. Deleting only works
+    in a shared cache; with a per-process one (CACHE_SHARED false), the other processes
+    keep their copies, so those expire after LOCAL_CACHE_MAX_TIMEOUT seconds instead.
+    A timeout of None (never expire) is capped the same way.
+    """
+    if settings.CACHE_SHARED:
+        return timeout
+    if timeout is None:
+        return settings.LOCAL_CACHE_MAX_TIMEOUT
+    return min(timeout, settings.LOCAL_CACHE_MAX_TIMEOUT)
@@ -0,0 +1,126 @@
+# mybackend/db_routers.py
+#
+# Read-replica routing. Nothing is read from the replica unless the code doing the reading
+# has opted in with read_from_replica() (views use ReplicaReadMixin), so the write path and
+# every read-after-write stays on the primary. Inside an opted-in block, the first write
+# pins the remaining reads of that block to the primary as well.
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.contrib.auth.middleware import get_user
+from django.db import DEFAULT_DB_ALIAS
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils.functional import SimpleLazyObject
+
+REPLICA_DB_ALIAS = 'replica'
+
+# None outside read_from_replica(); inside it, a dict recording whether a write happened.
+_replica_state = ContextVar('replica_state', default=None)
+
+
+def replica_configured():
+    return REPLICA_DB_ALIAS in settings.DATABASES
+
+
+def reads_from_replica():
+    """True when a read made here would be routed to the replica."""
+    state = _replica_state.get()
+    return state is not None and not state['wrote'] and replica_configured()
+
+
+@contextmanager
+def read_from_replica():
+    """
+    Route reads made inside the block to the replica, if one is configured.
+    """
+    token = _replica_state.set({'wrote': False})
+    try:
+        yield
+    finally:
+        _replica_state.reset(token)
+
+
+@contextmanager
+def read_from_primary():
+    """
+    Route reads made inside the block to the primary, even within read_from_replica().
+    """
+    token = _replica_state.set(None)
+    try:
+        yield
+    finally:
+        _replica_state.reset(token)
+
+
+def _iterate_on_replica(iterator):
+    """
+    Advance `iterator` one step at a time inside read_from_replica(), for streamed
+    responses whose queries run after the view has returned.
+    """
+    iterator = iter(iterator)
+    while True:
+        with read_from_replica():
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+def _user_on_primary(request):
+    with read_from_primary():
+        return get_user(request)
+
+
+class ReplicaReadMixin:
+    """
+    View mixin that serves GET and HEAD requests from the replica, including the body of
+    a streamed response. Other methods are untouched. Session and authentication lookups
+    stay on the primary, so a user who has just logged in or been created is found even
+    while the replica lags.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        if hasattr(request, 'user'):
+            # Replace AuthenticationMiddleware's lazy user, which would otherwise be
+            # loaded inside the replica block below.
+            request.user = SimpleLazyObject(lambda: _user_on_primary(request))
+        with read_from_replica():
+            response = super().dispatch(request, *args, **kwargs)
+        if isinstance(response, StreamingHttpResponse) and not isinstance(response, FileResponse):
+            response.streaming_content = _iterate_on_replica(response.streaming_content)
+        return response
+
+    def perform_authentication(self, request):
+        # DRF views: token and JWT authenticators query the primary too.
+        with read_from_primary():
+            super().perform_authentication(request)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if reads_from_replica():
+            return REPLICA_DB_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        state = _replica_state.get()
+        if state is not None:
+            state['wrote'] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary.
+        aliases = {DEFAULT_DB_ALIAS, REPLICA_DB_ALIAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == REPLICA_DB_ALIAS:
+            return False
+        return None
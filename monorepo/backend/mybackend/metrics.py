@@ -0,0 +1,186 @@
+# mybackend/metrics.py
+#
+# Per-request database instrumentation. QueryMetricsMiddleware times every SQL statement
+# through connection.execute_wrapper() and records, per view, the request count, request
+# time, query count and database time. The totals are served in Prometheus text format by
+# metrics_view (/api/metrics/); with DEBUG on, each response also carries its own numbers
+# in X-Query-* headers. Totals are kept per process, so scrape every worker (or run one).
+
+import logging
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import FileResponse, HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+logger = logging.getLogger(__name__)
+
+# View label for requests that did not resolve to a URL pattern.
+UNRESOLVED_VIEW = '<unresolved>'
+
+
+class RequestQueryStats:
+    """
+    Execute wrapper that counts and times the queries of one request.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest_duration = 0.0
+        self.slowest_sql = ''
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            if elapsed > self.slowest_duration:
+                self.slowest_duration = elapsed
+                self.slowest_sql = sql
+            if elapsed * 1000 >= settings.SLOW_QUERY_MS:
+                logger.warning(f"Slow query ({elapsed * 1000:.1f} ms): {sql}")
+
+    def capture(self):
+        """Context manager installing this wrapper on every database connection."""
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self))
+        return stack
+
+
+class MetricsRegistry:
+    """
+    Thread-safe per-view totals, rendered in Prometheus text format.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view, request_duration, stats):
+        with self._lock:
+            totals = self._views.setdefault(view, {
+                'requests': 0,
+                'request_seconds': 0.0,
+                'queries': 0,
+                'query_seconds': 0.0,
+                'max_queries': 0,
+                'slowest_query_seconds': 0.0,
+            })
+            totals['requests'] += 1
+            totals['request_seconds'] += request_duration
+            totals['queries'] += stats.count
+            totals['query_seconds'] += stats.duration
+            totals['max_queries'] = max(totals['max_queries'], stats.count)
+            totals['slowest_query_seconds'] = max(
+                totals['slowest_query_seconds'], stats.slowest_duration
+            )
+
+    def snapshot(self):
+        with self._lock:
+            return {view: dict(totals) for view, totals in self._views.items()}
+
+    def clear(self):
+        with self._lock:
+            self._views.clear()
+
+    def render(self):
+        families = [
+            ('http_requests_total', 'counter', 'Requests handled.', 'requests'),
+            ('http_request_duration_seconds_total', 'counter',
+             'Time spent handling requests.', 'request_seconds'),
+            ('db_queries_total', 'counter', 'SQL queries executed.', 'queries'),
+            ('db_query_duration_seconds_total', 'counter',
+             'Time spent executing SQL queries.', 'query_seconds'),
+            ('db_queries_per_request_max', 'gauge',
+             'Most SQL queries executed by a single request.', 'max_queries'),
+            ('db_slowest_query_seconds', 'gauge',
+             'Slowest single SQL query.', 'slowest_query_seconds'),
+        ]
+        views = sorted(self.snapshot().items())
+        lines = []
+        for name, kind, help_text, key in families:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for view, totals in views:
+                lines.append(f'{name}{{view="{_escape_label(view)}"}} {totals[key]}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def _escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return UNRESOLVED_VIEW
+    return match.view_name or match.route
+
+
+class QueryMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = RequestQueryStats()
+        started = time.perf_counter()
+        with stats.capture():
+            response = self.get_response(request)
+        view = _view_name(request)
+        if settings.DEBUG:
+            self._add_debug_headers(response, stats)
+        if response.streaming and not isinstance(response, FileResponse):
+            # The body's queries run while it is sent; record once it has been.
+            response.streaming_content = self._stream(
+                response.streaming_content, stats, view, started
+            )
+        else:
+            registry.record(view, time.perf_counter() - started, stats)
+        return response
+
+    def _stream(self, chunks, stats, view, started):
+        try:
+            chunks = iter(chunks)
+            while True:
+                with stats.capture():
+                    try:
+                        chunk = next(chunks)
+                    except StopIteration:
+                        return
+                yield chunk
+        finally:
+            registry.record(view, time.perf_counter() - started, stats)
+
+    def _add_debug_headers(self, response, stats):
+        # Streamed responses only report the queries made before the body was sent.
+        response['X-Query-Count'] = str(stats.count)
+        response['X-Query-Time-Ms'] = f'{stats.duration * 1000:.1f}'
+        if stats.slowest_sql:
+            response['X-Query-Slowest-Ms'] = f'{stats.slowest_duration * 1000:.1f}'
+            response['X-Query-Slowest'] = ' '.join(stats.slowest_sql.split())[:500]
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint. Requires `Authorization: Bearer <METRICS_TOKEN>` or a
+    staff session.
+    """
+    token = settings.METRICS_TOKEN
+    authorization = request.headers.get('Authorization', '')
+    authorized = bool(token) and constant_time_compare(authorization, f'Bearer {token}')
+    if not authorized and not request.user.is_staff:
+        return HttpResponseForbidden()
+    return HttpResponse(
+        registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
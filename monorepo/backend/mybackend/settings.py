@@ -41,6 +41,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'mybackend.metrics.QueryMetricsMiddleware',  # First, so every query is counted
     'corsheaders.middleware.CorsMiddleware',  # Must be high in the order
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -71,10 +72,63 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'mybackend.wsgi.application'
 
+# Database, configured with DATABASE_URL (e.g. postgres://user:pass@db:5432/scholarships);
+# defaults to the local SQLite file. Tests use mybackend/test_settings.py instead.
+SQLITE_URL = f"sqlite:///{BASE_DIR / 'db.sqlite3'}"
 DATABASES = {
+    'default': env.db('DATABASE_URL', default=SQLITE_URL),
+}
+if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    # DATABASE_POOL=true uses psycopg's connection pool (requires psycopg[pool]); otherwise
+    # each worker thread keeps its connection open for CONN_MAX_AGE seconds.
+    if env.bool('DATABASE_POOL', default=False):
+        DATABASES['default']['OPTIONS'] = {
+            **DATABASES['default'].get('OPTIONS', {}),
+            'pool': {
+                'min_size': env.int('DATABASE_POOL_MIN_SIZE', default=2),
+                'max_size': env.int('DATABASE_POOL_MAX_SIZE', default=10),
+                'timeout': env.int('DATABASE_POOL_TIMEOUT', default=10),
+            },
+        }
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+    else:
+        DATABASES['default']['CONN_MAX_AGE'] = env.int('CONN_MAX_AGE', default=60)
+        DATABASES['default']['CONN_HEALTH_CHECKS'] = env.bool(
+            'CONN_HEALTH_CHECKS', default=True
+        )
+
+# Optional read replica (REPLICA_DATABASE_URL) for report and listing reads; see
+# mybackend/db_routers.py. Pointing it at the same SQLite file works for local testing.
+if env('REPLICA_DATABASE_URL', default=''):
+    DATABASES['replica'] = {
+        **{key: value for key, value in DATABASES['default'].items()
+           if key in ('OPTIONS', 'CONN_MAX_AGE', 'CONN_HEALTH_CHECKS')},
+        **env.db('REPLICA_DATABASE_URL'),
+    }
+DATABASE_ROUTERS = ['mybackend.db_routers.ReplicaRouter']
+
+# Cache backend, selected with CACHE_BACKEND=file|redis|locmem. The default, file, is
+# shared by every worker on the host; use redis (requires the redis package) across hosts.
+# locmem is per process, so one worker's invalidations never reach the others; with it,
+# cached responses expire after LOCAL_CACHE_MAX_TIMEOUT seconds (see mybackend/caching.py)
+# and JWT claims are checked against the user table on every request (accounts/tokens.py).
+# CACHE_LOCATION overrides the backend's default location.
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'scholarship-app'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / 'cache')),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://localhost:6379/1'),
+}
+CACHE_BACKEND = env('CACHE_BACKEND', default='file')
+if CACHE_BACKEND not in CACHE_BACKENDS:
+    raise ValueError(f"CACHE_BACKEND must be one of {', '.join(CACHE_BACKENDS)}")
+# Whether every process serving requests sees the same cache.
+CACHE_SHARED = CACHE_BACKEND != 'locmem'
+LOCAL_CACHE_MAX_TIMEOUT = env.int('LOCAL_CACHE_MAX_TIMEOUT', default=5)
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND][0],
+        'LOCATION': env('CACHE_LOCATION', default=CACHE_BACKENDS[CACHE_BACKEND][1]),
+        'TIMEOUT': env.int('CACHE_TIMEOUT', default=300),
     }
 }
 
@@ -89,13 +143,20 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
         'rest_framework.authentication.TokenAuthentication',
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # Builds request.user from signed token claims, without a user query; see
+        # accounts/tokens.py.
+        'accounts.authentication.ClaimsJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
 }
 
+SIMPLE_JWT = {
+    'TOKEN_OBTAIN_SERIALIZER': 'accounts.serializers.ClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.serializers.ClaimsTokenRefreshSerializer',
+}
+
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
 USE_I18N = True
@@ -127,4 +188,36 @@ CORS_ALLOW_CREDENTIALS = True
 
 # Media files configuration
 MEDIA_URL = '/documents/'
-MEDIA_ROOT = BASE_DIR / 'documents'
\ No newline at end of file
+MEDIA_ROOT = BASE_DIR / 'documents'
+# Largest file accepted by the chunked document upload (see documents/uploads.py).
+DOCUMENT_UPLOAD_MAX_SIZE = env.int('DOCUMENT_UPLOAD_MAX_SIZE', default=100 * 1024 * 1024)
+# Seconds after its last chunk that an unfinished chunked upload is deleted by the
+# expire_upload_sessions command.
+UPLOAD_SESSION_EXPIRY = env.int('UPLOAD_SESSION_EXPIRY', default=24 * 60 * 60)
+# How document downloads are delivered (see documents/downloads.py): 'django' serves the
+# file from the worker; 'x-accel-redirect' (nginx) and 'x-sendfile' hand it to the proxy.
+# For nginx, DOCUMENT_ACCEL_REDIRECT_PREFIX must be an internal location aliased to
+# MEDIA_ROOT.
+DOCUMENT_DOWNLOAD_MODE = env('DOCUMENT_DOWNLOAD_MODE', default='django')
+if DOCUMENT_DOWNLOAD_MODE not in ('django', 'x-accel-redirect', 'x-sendfile'):
+    raise ValueError("DOCUMENT_DOWNLOAD_MODE must be one of django, x-accel-redirect, x-sendfile")
+DOCUMENT_ACCEL_REDIRECT_PREFIX = env(
+    'DOCUMENT_ACCEL_REDIRECT_PREFIX', default='/protected-documents/'
+)
+
+# Generated CSV report snapshots (see reports/snapshots.py). The directory may be local to
+# each host; the data version that invalidates them is kept in the shared cache.
+REPORT_SNAPSHOT_DIR = env('REPORT_SNAPSHOT_DIR', default=str(BASE_DIR / 'report_snapshots'))
+
+# Query metrics (see mybackend/metrics.py). /api/metrics/ accepts this bearer token or a
+# staff session; queries slower than SLOW_QUERY_MS are logged.
+METRICS_TOKEN = env('METRICS_TOKEN', default='')
+SLOW_QUERY_MS = env.int('SLOW_QUERY_MS', default=200)
+
+# Stored matching runs keep only the MATCH_TOP_K best scholarships per application (all
+# when unset), scoring at least MATCH_MIN_SCORE; see applications/matching.py.
+MATCH_TOP_K = env.int('MATCH_TOP_K', default=None)
+MATCH_MIN_SCORE = env.int('MATCH_MIN_SCORE', default=1)
+# Seconds a match job may stay running before it is marked failed, as its worker has
+# presumably died (see applications/jobs.py).
+MATCH_JOB_TIMEOUT = env.int('MATCH_JOB_TIMEOUT', default=60 * 60)
@@ -0,0 +1,19 @@
+# Settings for the test suite (pytest.ini selects this module; for manage.py test pass
+# --settings=mybackend.test_settings). Tests run against SQLite, or TEST_DATABASE_URL,
+# never the DATABASE_URL or replica that the environment may configure for the app.
+
+from .settings import *  # noqa: F401,F403
+from .settings import SQLITE_URL, env
+
+DATABASES = {
+    'default': env.db('TEST_DATABASE_URL', default=SQLITE_URL),
+}
+
+# The test process is the only one, so its local-memory cache is shared by every request.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'scholarship-app-tests',
+    }
+}
+CACHE_SHARED = True
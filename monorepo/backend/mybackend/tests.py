@@ -0,0 +1,124 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from reports.views import DASHBOARD_STATS_CACHE_KEY
+from scholarships.models import Scholarship
+from .caching import invalidated_timeout
+from .metrics import registry
+from .db_routers import (
+    ReplicaRouter,
+    read_from_primary,
+    read_from_replica,
+    reads_from_replica,
+)
+
+with_replica = mock.patch('mybackend.db_routers.replica_configured', new=lambda: True)
+
+
+class ReplicaRouterTestCase(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    @with_replica
+    def test_reads_use_replica_only_when_opted_in(self):
+        self.assertIsNone(self.router.db_for_read(Scholarship))
+        with read_from_replica():
+            self.assertEqual(self.router.db_for_read(Scholarship), 'replica')
+            with read_from_primary():
+                self.assertIsNone(self.router.db_for_read(Scholarship))
+            self.assertEqual(self.router.db_for_read(Scholarship), 'replica')
+        self.assertIsNone(self.router.db_for_read(Scholarship))
+
+    @with_replica
+    def test_write_pins_later_reads_to_primary(self):
+        with read_from_replica():
+            self.assertEqual(self.router.db_for_write(Scholarship), 'default')
+            self.assertIsNone(self.router.db_for_read(Scholarship))
+        with read_from_replica():
+            self.assertEqual(self.router.db_for_read(Scholarship), 'replica')
+
+    def test_no_replica_configured(self):
+        with read_from_replica():
+            self.assertIsNone(self.router.db_for_read(Scholarship))
+
+    @with_replica
+    def test_reads_from_replica(self):
+        self.assertFalse(reads_from_replica())
+        with read_from_replica():
+            self.assertTrue(reads_from_replica())
+            self.router.db_for_write(Scholarship)
+            self.assertFalse(reads_from_replica())
+
+    def test_replica_is_never_migrated(self):
+        self.assertFalse(self.router.allow_migrate('replica', 'scholarships'))
+        self.assertIsNone(self.router.allow_migrate('default', 'scholarships'))
+
+
+class ReplicaViewTestCase(TestCase):
+    # No 'replica' database exists under tests, so any query routed there fails: these
+    # requests succeed only if the queries named below run on the primary.
+
+    @with_replica
+    def test_authentication_on_primary(self):
+        user = get_user_model().objects.create_user(
+            username='u', password='pass', email='u@example.com'
+        )
+        self.client.force_login(user)
+        # Cached stats, so the view itself runs no query.
+        cache.set(DASHBOARD_STATS_CACHE_KEY, {'scholarships': {}}, 30)
+        try:
+            response = self.client.get(reverse('report-dashboard'))
+        finally:
+            cache.delete(DASHBOARD_STATS_CACHE_KEY)
+        self.assertEqual(response.status_code, 200)
+
+
+class InvalidatedTimeoutTestCase(SimpleTestCase):
+    def test_shared_cache_keeps_timeout(self):
+        self.assertEqual(invalidated_timeout(600), 600)
+        self.assertIsNone(invalidated_timeout(None))
+
+    @override_settings(CACHE_SHARED=False, LOCAL_CACHE_MAX_TIMEOUT=5)
+    def test_local_cache_caps_timeout(self):
+        self.assertEqual(invalidated_timeout(600), 5)
+        self.assertEqual(invalidated_timeout(2), 2)
+        self.assertEqual(invalidated_timeout(None), 5)
+
+
+class QueryMetricsTestCase(TestCase):
+    def setUp(self):
+        registry.clear()
+        Scholarship.objects.create(name='S', description='d', amount=100)
+
+    def test_streamed_report_queries_recorded(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('report-available'))
+            b''.join(response.streaming_content)
+            response.close()
+        totals = registry.snapshot()['report-available']
+        self.assertEqual(totals['requests'], 1)
+        self.assertEqual(totals['queries'], len(queries))
+        self.assertGreater(totals['queries'], 0)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_endpoint_prometheus_format(self):
+        self.client.get('/api/scholarships/')
+        url = reverse('metrics')
+        self.assertEqual(self.client.get(url).status_code, 403)
+        response = self.client.get(url, HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('# TYPE db_queries_total counter', body)
+        self.assertIn('http_requests_total{view="scholarship-list"} 1', body)
+
+    @override_settings(DEBUG=True)
+    def test_debug_headers(self):
+        response = self.client.get('/api/scholarships/')
+        self.assertEqual(response['X-Query-Count'], '1')
+        self.assertIn('X-Query-Time-Ms', response)
@@ -0,0 +1,51 @@
+# reports/signals.py
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from applications.models import Application
+from applications.signals import applications_awarded, applications_imported
+from scholarships.models import Scholarship
+from .snapshots import bump_version
+
+User = get_user_model()
+
+# User columns that appear in any report. Saves touching only other columns (login
+# counters, passwords, role flags) leave the report snapshots valid.
+REPORT_USER_FIELDS = ('first_name', 'last_name', 'phone', 'email', 'net_id', 'major', 'gpa')
+
+
+def _invalidate_reports():
+    # Bump again on commit in case a report was rebuilt from pre-commit rows meanwhile.
+    bump_version()
+    transaction.on_commit(bump_version)
+
+
+def _report_user_state(instance):
+    return tuple(instance.__dict__.get(field) for field in REPORT_USER_FIELDS)
+
+
+@receiver(post_save, sender=Scholarship)
+@receiver(post_delete, sender=Scholarship)
+@receiver(post_save, sender=Application)
+@receiver(post_delete, sender=Application)
+@receiver(post_delete, sender=User)
+@receiver(applications_imported)
+@receiver(applications_awarded)
+def report_data_changed(sender, **kwargs):
+    _invalidate_reports()
+
+
+@receiver(post_init, sender=User)
+def remember_report_user_state(sender, instance, **kwargs):
+    instance._report_state = _report_user_state(instance)
+
+
+@receiver(post_save, sender=User)
+def report_user_changed(sender, instance, created, **kwargs):
+    state = _report_user_state(instance)
+    if created or state != getattr(instance, '_report_state', None):
+        _invalidate_reports()
+    instance._report_state = state
@@ -0,0 +1,70 @@
+# reports/snapshots.py
+#
+# On-disk snapshots of the generated CSV reports. Each snapshot is named after the data
+# version that was current when it was built; the version is bumped by the signal handlers
+# in reports/signals.py whenever report data changes, so a snapshot is served only while
+# nothing it depends on has changed since.
+#
+# The version is kept in the cache, which every app host shares (see CACHE_BACKEND), so
+# a write on one host invalidates the snapshots on all of them; REPORT_SNAPSHOT_DIR only
+# holds the bytes and can be local to each host. A lost version entry starts a new
+# version, which no snapshot has yet.
+
+import os
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+
+from mybackend.caching import invalidated_timeout
+
+VERSION_CACHE_KEY = 'reports:data-version'
+
+
+def snapshot_dir():
+    return Path(settings.REPORT_SNAPSHOT_DIR)
+
+
+def current_version():
+    version = cache.get(VERSION_CACHE_KEY)
+    if version is None:
+        # add() rather than set(), so concurrent first readers agree on one version.
+        cache.add(VERSION_CACHE_KEY, uuid.uuid4().hex, invalidated_timeout(None))
+        version = cache.get(VERSION_CACHE_KEY) or uuid.uuid4().hex
+    return version
+
+
+def bump_version():
+    """Invalidate every snapshot, on every host, by moving to a new data version."""
+    cache.set(VERSION_CACHE_KEY, uuid.uuid4().hex, invalidated_timeout(None))
+
+
+def snapshot_path(report, version):
+    return snapshot_dir() / f'{report}-{version}.csv'
+
+
+def record_snapshot(report, version, chunks):
+    """
+    Pass `chunks` through unchanged while also writing them to a temporary file, which is
+    moved into place as the snapshot for `version` once the stream completes. An
+    interrupted download leaves no snapshot behind.
+    """
+    directory = snapshot_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    tmp = directory / f'.{report}-{uuid.uuid4().hex}.tmp'
+    completed = False
+    try:
+        with open(tmp, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+                yield chunk
+        os.replace(tmp, snapshot_path(report, version))
+        completed = True
+    finally:
+        if not completed:
+            tmp.unlink(missing_ok=True)
+    # Snapshots for older versions can never be served again.
+    for stale in directory.glob(f'{report}-*.csv'):
+        if stale.name != snapshot_path(report, version).name:
+            stale.unlink(missing_ok=True)
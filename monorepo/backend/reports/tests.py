@@ -1,6 +1,10 @@
 import csv
 import io
-from django.test import TestCase, Client
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from scholarships.models import Scholarship
@@ -87,8 +91,9 @@ class ReportsTestCase(TestCase):
         # Basic checks
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertTrue(response.streaming)
         # Parse CSV into list of rows
-        content = response.content.decode('utf-8')
+        content = b''.join(response.streaming_content).decode('utf-8')
         return list(csv.reader(io.StringIO(content)))
 
     def test_available_report(self):
@@ -125,4 +130,88 @@ class ReportsTestCase(TestCase):
         rows = self._get_rows('report-active-donors')
         header, *data = rows
         # Should see the donor’s name
-        self.assertTrue(any(self.donor.first_name in r[0] for r in data))
\ No newline at end of file
+        self.assertTrue(any(self.donor.first_name in r[0] for r in data))
+
+    def test_donors_resolved_in_one_query(self):
+        other_donor = User.objects.create_user(
+            username='donor2', email='donor2@example.com', password='pass',
+            first_name='Second', last_name='Donor'
+        )
+        for i in range(5):
+            Scholarship.objects.create(
+                name=f'Extra{i}', amount=100, description='d', is_active=True,
+                donor_id=other_donor.id if i % 2 else self.donor.id
+            )
+        Scholarship.objects.create(
+            name='Orphan', amount=100, description='d', is_active=True, donor_id=9999
+        )
+        # One query for the scholarships and one for all of their donors.
+        with self.assertNumQueries(2):
+            rows = self._get_rows('report-active-donors')
+        header, *data = rows
+        donors = {r[3]: r[0] for r in data}
+        self.assertEqual(donors['Extra1'], 'Second Donor')
+        self.assertEqual(donors['Extra2'], 'Donor User')
+        self.assertEqual(donors['Orphan'], '')
+
+    def test_repeat_download_served_from_snapshot(self):
+        first = self._get_rows('report-available')
+        # The snapshot is a plain file send: no queries at all.
+        with self.assertNumQueries(0):
+            second = self._get_rows('report-available')
+        self.assertEqual(first, second)
+
+        self.active_s.name = 'RenamedScholar'
+        self.active_s.save()
+        header, *data = self._get_rows('report-available')
+        self.assertTrue(any(r[0] == 'RenamedScholar' for r in data))
+
+    def test_login_counter_changes_keep_snapshot(self):
+        self._get_rows('report-active-donors')
+        self.donor.failed_login_attempts = 1
+        self.donor.save()
+        with self.assertNumQueries(0):
+            self._get_rows('report-active-donors')
+        self.donor.phone = '5550000'
+        self.donor.save()
+        header, *data = self._get_rows('report-active-donors')
+        self.assertTrue(any(r[1] == '5550000' for r in data))
+
+    def test_write_on_another_host_invalidates_snapshot(self):
+        self._get_rows('report-available')
+        other_host_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, other_host_dir)
+        # Another host, with its own snapshot directory, handles the write.
+        with override_settings(REPORT_SNAPSHOT_DIR=other_host_dir):
+            self.active_s.name = 'RenamedElsewhere'
+            self.active_s.save()
+        header, *data = self._get_rows('report-available')
+        self.assertTrue(any(r[0] == 'RenamedElsewhere' for r in data))
+
+    def test_replica_rows_not_recorded(self):
+        with mock.patch('reports.views.reads_from_replica', return_value=True):
+            self._get_rows('report-available')
+        # No snapshot was kept, so the report is built again.
+        with self.assertNumQueries(2):
+            self._get_rows('report-available')
+        with self.assertNumQueries(0):
+            self._get_rows('report-available')
+
+
+    def test_dashboard_stats_one_query_per_table(self):
+        self.client.force_login(self.donor)
+        url = reverse('report-dashboard')
+        # Session + user lookups for the login, then one query per table.
+        with self.assertNumQueries(5):
+            stats = self.client.get(url, {'refresh': 1}).json()
+        self.assertEqual(stats['scholarships']['total_scholarships'], 2)
+        self.assertEqual(stats['scholarships']['active_scholarships'], 1)
+        self.assertEqual(stats['scholarships']['inactive_scholarships'], 1)
+        self.assertEqual(stats['applications'], {
+            'total_applications': 2, 'awarded_applications': 1, 'favorited_applications': 0,
+        })
+        self.assertEqual(stats['users'], {
+            'total_users': 2, 'pendingCount': 0, 'lockedUserCount': 0,
+        })
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(url).json(), stats)
@@ -6,6 +6,7 @@ from .views import (
     AwardedScholarshipReportView,
     DemographicsReportView,
     ActiveDonorReportView,
+    DashboardStatsView,
 )
 
 urlpatterns = [
@@ -15,4 +16,5 @@ urlpatterns = [
     path('awarded/', AwardedScholarshipReportView.as_view(), name='report-awarded'),
     path('demographics/', DemographicsReportView.as_view(), name='report-demographics'),
     path('active-donors/', ActiveDonorReportView.as_view(), name='report-active-donors'),
+    path('dashboard/', DashboardStatsView.as_view(), name='report-dashboard'),
 ]
\ No newline at end of file
@@ -1,132 +1,223 @@
 import csv
-from django.http import HttpResponse
+from itertools import islice
+from pathlib import Path
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.http import FileResponse, StreamingHttpResponse
 from django.views import View
 from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from mybackend.db_routers import ReplicaReadMixin, reads_from_replica
 from scholarships.models import Scholarship
 from applications.models import Application
+from . import snapshots
 
 User = get_user_model()
 
-def _write_csv_response(filename, header, rows):
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    writer = csv.writer(response)
-    writer.writerow(header)
+# Rows fetched from the database per round trip while streaming a report.
+QUERY_CHUNK_SIZE = 500
+# CSV rows encoded into each chunk sent to the client.
+ROWS_PER_CHUNK = 200
+# Dashboard counters are cached briefly; they are refreshed often but need not be exact.
+DASHBOARD_STATS_CACHE_KEY = 'reports:dashboard-stats'
+DASHBOARD_STATS_TIMEOUT = 30
+
+
+class _Echo:
+    """File-like object whose write() hands the formatted CSV line straight back."""
+    def write(self, value):
+        return value
+
+
+def _csv_chunks(header, rows):
+    writer = csv.writer(_Echo())
+    buffer = [writer.writerow(header)]
     for row in rows:
-        writer.writerow(row)
+        buffer.append(writer.writerow(row))
+        if len(buffer) >= ROWS_PER_CHUNK:
+            yield ''.join(buffer).encode('utf-8')
+            buffer = []
+    if buffer:
+        yield ''.join(buffer).encode('utf-8')
+
+
+def _with_donors(scholarships):
+    """
+    Yield (scholarship, donor) pairs for a Scholarship queryset. donor_id is a plain
+    integer rather than a foreign key, so donors are resolved with one id__in query per
+    chunk of scholarships; donor is None when the ID matches no user.
+    """
+    iterator = scholarships.iterator(chunk_size=QUERY_CHUNK_SIZE)
+    while True:
+        chunk = list(islice(iterator, QUERY_CHUNK_SIZE))
+        if not chunk:
+            return
+        donor_ids = {s.donor_id for s in chunk if s.donor_id is not None}
+        donors = User.objects.only(
+            'first_name', 'last_name', 'phone', 'email'
+        ).in_bulk(donor_ids)
+        for s in chunk:
+            yield s, donors.get(s.donor_id)
+
+
+def _donor_columns(donor):
+    """Donor name, phone and email report columns (blank when there is no donor)."""
+    if donor is None:
+        return ['', '', '']
+    return [f"{donor.first_name} {donor.last_name}", donor.phone, donor.email]
+
+
+def _stream_csv_response(filename, header, rows):
+    """
+    Serve the report as a CSV download. If a snapshot for the current data version exists
+    it is sent as a plain file; otherwise `rows` (a lazy generator, typically over a
+    queryset iterator) is streamed, so the report is never held in memory and the download
+    starts immediately, and recorded as the new snapshot on the way out.
+
+    Rows read from the replica are streamed without being recorded: the data version is
+    bumped when a write commits on the primary, so a lagging replica's rows would be kept
+    as that version's snapshot and served until the next change.
+    """
+    report = Path(filename).stem
+    version = snapshots.current_version()
+    try:
+        snapshot = open(snapshots.snapshot_path(report, version), 'rb')
+    except FileNotFoundError:
+        pass
+    else:
+        return FileResponse(
+            snapshot, as_attachment=True, filename=filename, content_type='text/csv'
+        )
+    chunks = _csv_chunks(header, rows)
+    if not reads_from_replica():
+        chunks = snapshots.record_snapshot(report, version, chunks)
+    response = StreamingHttpResponse(chunks, content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
     return response
 
-class AvailableScholarshipReportView(View):
+class AvailableScholarshipReportView(ReplicaReadMixin, View):
     def get(self, request):
         qs = Scholarship.objects.filter(is_active=True)
         header = [
             'Name','Amount','Donor','Donor Phone','Donor Email',
             'Num Available','Required Majors','Required GPA','Deadline','Other Requirements'
         ]
-        rows = []
-        for s in qs:
-            donor = User.objects.filter(id=s.donor_id).first()
-            rows.append([
-                s.name, s.amount,
-                f"{donor.first_name} {donor.last_name}" if donor else '',
-                donor.phone if donor else '',
-                donor.email if donor else '',
-                getattr(s, 'quantity', ''),            # adjust if you have a field
-                s.allowed_major, s.min_gpa, s.deadline, s.description
-            ])
-        return _write_csv_response('available_scholarships.csv', header, rows)
-
-class ArchivedScholarshipReportView(View):
+
+        def rows():
+            for s, donor in _with_donors(qs):
+                yield [
+                    s.name, s.amount,
+                    *_donor_columns(donor),
+                    getattr(s, 'quantity', ''),            # adjust if you have a field
+                    s.allowed_major, s.min_gpa, s.deadline, s.description
+                ]
+        return _stream_csv_response('available_scholarships.csv', header, rows())
+
+class ArchivedScholarshipReportView(ReplicaReadMixin, View):
     def get(self, request):
         qs = Scholarship.objects.filter(is_active=False)
         header = [
             'Name','Amount','Donor','Donor Phone','Donor Email',
             'Num Available','Required Majors','Required GPA','Deadline','Other Requirements'
         ]
-        rows = []
-        for s in qs:
-            donor = User.objects.filter(id=s.donor_id).first()
-            rows.append([
-                s.name, s.amount,
-                f"{donor.first_name} {donor.last_name}" if donor else '',
-                donor.phone if donor else '',
-                donor.email if donor else '',
-                getattr(s, 'quantity', ''), s.allowed_major,
-                s.min_gpa, s.deadline, s.description
-            ])
-        return _write_csv_response('archived_scholarships.csv', header, rows)
-
-class ApplicantReportView(View):
+
+        def rows():
+            for s, donor in _with_donors(qs):
+                yield [
+                    s.name, s.amount,
+                    *_donor_columns(donor),
+                    getattr(s, 'quantity', ''), s.allowed_major,
+                    s.min_gpa, s.deadline, s.description
+                ]
+        return _stream_csv_response('archived_scholarships.csv', header, rows())
+
+class ApplicantReportView(ReplicaReadMixin, View):
     def get(self, request):
-        apps = Application.objects.all()
+        apps = Application.objects.select_related('applicant').only(
+            'data', 'applicant__first_name', 'applicant__last_name'
+        )
         header = [
             'Full Name','Pronoun','Student ID','Major','Minor',
             'GPA','Current Year','Ethnicity','Essay','Work Experience'
         ]
-        rows = []
-        for a in apps:
-            data = a.data
-            user = a.applicant
-            rows.append([
-                f"{user.first_name} {user.last_name}",
-                data.get('pronoun',''),
-                data.get('student_id',''),
-                data.get('major',''),
-                data.get('minor',''),
-                data.get('gpa',''),
-                data.get('year',''),
-                data.get('ethnicity',''),
-                data.get('personal_statement',''),
-                data.get('work_experience','')
-            ])
-        return _write_csv_response('scholarship_applicants.csv', header, rows)
-
-class AwardedScholarshipReportView(View):
+
+        def rows():
+            for a in apps.iterator(chunk_size=QUERY_CHUNK_SIZE):
+                data = a.data
+                user = a.applicant
+                yield [
+                    f"{user.first_name} {user.last_name}",
+                    data.get('pronoun',''),
+                    data.get('student_id',''),
+                    data.get('major',''),
+                    data.get('minor',''),
+                    data.get('gpa',''),
+                    data.get('year',''),
+                    data.get('ethnicity',''),
+                    data.get('personal_statement',''),
+                    data.get('work_experience','')
+                ]
+        return _stream_csv_response('scholarship_applicants.csv', header, rows())
+
+class AwardedScholarshipReportView(ReplicaReadMixin, View):
     def get(self, request):
-        apps = Application.objects.filter(awarded=True)
+        apps = Application.objects.filter(awarded=True).select_related(
+            'scholarship', 'applicant'
+        ).only(
+            'ethnicity', 'scholarship__name', 'scholarship__amount',
+            'applicant__first_name', 'applicant__last_name', 'applicant__net_id',
+            'applicant__major', 'applicant__gpa', 'applicant__email',
+        )
         header = [
             'Scholarship','Amount','Awardee Name','Awardee NetID',
             'Awardee Major','Awardee GPA','Awardee Ethnicity','Awardee Email'
         ]
-        rows = []
-        for a in apps:
-            s = a.scholarship
-            u = a.applicant
-            rows.append([
-                s.name, s.amount,
-                f"{u.first_name} {u.last_name}", u.net_id,
-                u.major or '', u.gpa or '',
-                a.data.get('ethnicity',''), u.email
-            ])
-        return _write_csv_response('awarded_scholarships.csv', header, rows)
-
-class DemographicsReportView(View):
+
+        def rows():
+            for a in apps.iterator(chunk_size=QUERY_CHUNK_SIZE):
+                s = a.scholarship
+                u = a.applicant
+                yield [
+                    s.name, s.amount,
+                    f"{u.first_name} {u.last_name}", u.net_id,
+                    u.major or '', u.gpa or '',
+                    a.ethnicity, u.email
+                ]
+        return _stream_csv_response('awarded_scholarships.csv', header, rows())
+
+class DemographicsReportView(ReplicaReadMixin, View):
     def get(self, request):
-        apps = Application.objects.all()
+        apps = Application.objects.select_related('applicant').only(
+            'data', 'applicant__first_name', 'applicant__last_name', 'applicant__gpa'
+        )
         header = [
             'Full Name','Pronoun','Student ID','Major','Minor',
             'GPA','Current Year','Ethnicity','Essay','Work Experience'
         ]
-        rows = []
-        for a in apps:
-            data = a.data
-            u = a.applicant
-            rows.append([
-                f"{u.first_name} {u.last_name}",
-                data.get('pronoun',''),
-                data.get('student_id',''),
-                data.get('major',''),
-                data.get('minor',''),
-                u.gpa or data.get('gpa',''),
-                data.get('year',''),
-                data.get('ethnicity',''),
-                data.get('personal_statement',''),
-                data.get('work_experience','')
-            ])
-        return _write_csv_response('student_demographics.csv', header, rows)
-
-class ActiveDonorReportView(View):
+
+        def rows():
+            for a in apps.iterator(chunk_size=QUERY_CHUNK_SIZE):
+                data = a.data
+                u = a.applicant
+                yield [
+                    f"{u.first_name} {u.last_name}",
+                    data.get('pronoun',''),
+                    data.get('student_id',''),
+                    data.get('major',''),
+                    data.get('minor',''),
+                    u.gpa or data.get('gpa',''),
+                    data.get('year',''),
+                    data.get('ethnicity',''),
+                    data.get('personal_statement',''),
+                    data.get('work_experience','')
+                ]
+        return _stream_csv_response('student_demographics.csv', header, rows())
+
+class ActiveDonorReportView(ReplicaReadMixin, View):
     def get(self, request):
         qs = Scholarship.objects.filter(is_active=True)
         header = [
@@ -134,15 +225,45 @@ class ActiveDonorReportView(View):
             'Scholarship','Amount','Num Available',
             'Required Majors','Required GPA','Deadline'
         ]
-        rows = []
-        for s in qs:
-            donor = User.objects.filter(id=s.donor_id).first()
-            rows.append([
-                f"{donor.first_name} {donor.last_name}" if donor else '',
-                donor.phone if donor else '',
-                donor.email if donor else '',
-                s.name, s.amount,
-                getattr(s, 'quantity', ''),
-                s.allowed_major, s.min_gpa, s.deadline
-            ])
-        return _write_csv_response('active_donors.csv', header, rows)
\ No newline at end of file
+
+        def rows():
+            for s, donor in _with_donors(qs):
+                yield [
+                    *_donor_columns(donor),
+                    s.name, s.amount,
+                    getattr(s, 'quantity', ''),
+                    s.allowed_major, s.min_gpa, s.deadline
+                ]
+        return _stream_csv_response('active_donors.csv', header, rows())
+
+class DashboardStatsView(ReplicaReadMixin, APIView):
+    """
+    All admin dashboard counters in one response, computed with one conditional-aggregate
+    query per table and cached for DASHBOARD_STATS_TIMEOUT seconds. Pass ?refresh=1 to
+    bypass the cache.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        stats = None
+        if not request.query_params.get('refresh'):
+            stats = cache.get(DASHBOARD_STATS_CACHE_KEY)
+        if stats is None:
+            stats = {
+                'scholarships': Scholarship.objects.summary(),
+                'applications': Application.objects.aggregate(
+                    total_applications=Count('id'),
+                    awarded_applications=Count('id', filter=Q(awarded=True)),
+                    favorited_applications=Count('id', filter=Q(favorited_by_donor=True)),
+                ),
+                # Key names match PendingRoleRequestsCountView and LockedUsersCountView.
+                'users': User.objects.aggregate(
+                    total_users=Count('id'),
+                    pendingCount=Count(
+                        'id', filter=Q(requested_role__isnull=False, role_approved=False)
+                    ),
+                    lockedUserCount=Count('id', filter=Q(is_locked=True)),
+                ),
+            }
+            cache.set(DASHBOARD_STATS_CACHE_KEY, stats, DASHBOARD_STATS_TIMEOUT)
+        return Response(stats, status=status.HTTP_200_OK)
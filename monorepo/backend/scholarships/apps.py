@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ScholarshipsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'scholarships'
+
+    def ready(self):
+        # Register signal handlers that clear cached scholarship responses.
+        from . import signals  # noqa: F401
@@ -0,0 +1,46 @@
+# scholarships/cache.py
+#
+# Response caching for the public scholarship read endpoints. Only anonymous requests are
+# cached, because authenticated responses include the per-user is_bookmarked flag. The
+# entries for a scholarship are deleted by scholarships/signals.py whenever it changes.
+
+from django.core.cache import cache
+from rest_framework.response import Response
+
+from mybackend.caching import invalidated_timeout
+from mybackend.db_routers import read_from_primary
+
+LIST_KEY = 'scholarships:list'
+RESPONSE_TIMEOUT = 600
+
+
+def detail_key(pk):
+    return f'scholarships:detail:{pk}'
+
+
+def donor_key(donor_id):
+    return f'scholarships:donor:{donor_id}'
+
+
+def cached_anonymous_response(request, key, build):
+    """
+    Return a Response with the data from build(), served from the cache for anonymous
+    requests. build() may raise (e.g. Http404); nothing is cached then.
+    """
+    if request.user and request.user.is_authenticated:
+        return Response(build())
+    data = cache.get(key)
+    if data is None:
+        # A copy built from a lagging replica could outlive the invalidation that
+        # triggered the rebuild, so cached copies are always read from the primary.
+        with read_from_primary():
+            data = build()
+        cache.set(key, data, invalidated_timeout(RESPONSE_TIMEOUT))
+    return Response(data)
+
+
+def invalidate(pk, donor_ids=()):
+    """Drop the cached list and the entries that can contain scholarship `pk`."""
+    keys = [LIST_KEY, detail_key(pk)]
+    keys += [donor_key(donor_id) for donor_id in donor_ids if donor_id is not None]
+    cache.delete_many(keys)
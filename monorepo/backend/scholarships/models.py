@@ -1,8 +1,42 @@
 # scholarships/models.py
 
 from django.db import models
+from django.db.models import Avg, Count, Exists, OuterRef, Q, Value
 from django.conf import settings
 
+
+class ScholarshipQuerySet(models.QuerySet):
+    def with_bookmark_info(self, user=None):
+        """
+        Annotate bookmark_count and, for the given user, is_bookmarked, so serializing a
+        list of scholarships needs no per-row bookmark queries.
+        """
+        if user is not None and user.is_authenticated:
+            bookmarked = Exists(
+                Scholarship.objects.filter(pk=OuterRef('pk'), bookmarked_by=user)
+            )
+        else:
+            bookmarked = Value(False)
+        return self.annotate(
+            bookmark_count=Count('bookmarked_by', distinct=True),
+            is_bookmarked=bookmarked,
+        )
+
+    def summary(self):
+        """
+        Scholarship report counters, computed with conditional aggregation in one query.
+        """
+        stats = self.aggregate(
+            total_scholarships=Count('id'),
+            average_amount=Avg('amount'),
+            active_scholarships=Count('id', filter=Q(is_active=True)),
+        )
+        stats['inactive_scholarships'] = (
+            stats['total_scholarships'] - stats['active_scholarships']
+        )
+        return stats
+
+
 class Scholarship(models.Model):
     name = models.CharField(max_length=255)
     description = models.TextField()
@@ -25,6 +59,8 @@ class Scholarship(models.Model):
         blank=True
     )
 
+    objects = ScholarshipQuerySet.as_manager()
+
     class Meta:
         ordering = ["deadline"]
 
@@ -2,16 +2,27 @@ from rest_framework import serializers
 from .models import Scholarship
 
 class ScholarshipSerializer(serializers.ModelSerializer):
-    bookmark_count = serializers.IntegerField(source='bookmarked_by.count', read_only=True)
+    # Both fields read the annotations from Scholarship.objects.with_bookmark_info() when
+    # present and fall back to a query per object otherwise.
+    bookmark_count = serializers.SerializerMethodField()
     is_bookmarked = serializers.SerializerMethodField()
 
     class Meta:
         model = Scholarship
-        fields = '__all__'  # You may list fields explicitly if preferred
+        # bookmarked_by would load every bookmarking user per row; clients use
+        # bookmark_count / is_bookmarked instead.
+        exclude = ['bookmarked_by']
+
+    def get_bookmark_count(self, obj):
+        if hasattr(obj, "bookmark_count"):
+            return obj.bookmark_count
+        return obj.bookmarked_by.count()
 
     def get_is_bookmarked(self, obj):
         # Ensure we have access to the request in serializer context
         request = self.context.get("request")
         if request and request.user and request.user.is_authenticated:
-            return request.user in obj.bookmarked_by.all()
+            if hasattr(obj, "is_bookmarked"):
+                return obj.is_bookmarked
+            return obj.bookmarked_by.filter(pk=request.user.pk).exists()
         return False
\ No newline at end of file
@@ -0,0 +1,48 @@
+# scholarships/signals.py
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from . import cache as scholarship_cache
+from .models import Scholarship
+
+
+def _invalidate(pk, donor_ids):
+    # Drop again on commit in case a response was rebuilt from pre-commit rows meanwhile.
+    scholarship_cache.invalidate(pk, donor_ids)
+    transaction.on_commit(lambda: scholarship_cache.invalidate(pk, donor_ids))
+
+
+@receiver(post_init, sender=Scholarship)
+def remember_donor(sender, instance, **kwargs):
+    # The donor a scholarship was loaded with, so moving it to another donor also clears
+    # the previous donor's cached listing.
+    instance._loaded_donor_id = instance.__dict__.get('donor_id')
+
+
+@receiver(post_save, sender=Scholarship)
+@receiver(post_delete, sender=Scholarship)
+def scholarship_changed(sender, instance, **kwargs):
+    donor_ids = {instance.donor_id, getattr(instance, '_loaded_donor_id', None)}
+    _invalidate(instance.pk, donor_ids)
+    instance._loaded_donor_id = instance.donor_id
+
+
+@receiver(m2m_changed, sender=Scholarship.bookmarked_by.through)
+def bookmarks_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Bookmark counts are part of the cached responses."""
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            _invalidate(instance.pk, {instance.donor_id})
+        return
+    # Changed from the user side: instance is the user and pk_set holds scholarship IDs.
+    # clear() passes no IDs, so look them up before the rows are removed.
+    if action in ('post_add', 'post_remove'):
+        scholarships = Scholarship.objects.filter(pk__in=pk_set)
+    elif action == 'pre_clear':
+        scholarships = instance.saved_scholarships.all()
+    else:
+        return
+    for pk, donor_id in scholarships.values_list('pk', 'donor_id'):
+        _invalidate(pk, {donor_id})
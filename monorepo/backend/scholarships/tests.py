@@ -63,4 +63,51 @@ class ScholarshipsTestCase(APITestCase):
         }
         response = self.client.post(url, data, format='json')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertTrue(Scholarship.objects.filter(name='New Scholarship').exists())
\ No newline at end of file
+        self.assertTrue(Scholarship.objects.filter(name='New Scholarship').exists())
+
+    def test_list_bookmark_fields_use_constant_queries(self):
+        """Bookmark count and flag come from annotations, not per-row queries."""
+        for i in range(5):
+            Scholarship.objects.create(name=f'Extra {i}', description='d', amount=100)
+        self.scholarship1.bookmarked_by.add(self.normal_user, self.admin_user)
+        self.client.force_authenticate(self.normal_user)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/scholarships/')
+        rows = {row['id']: row for row in response.data}
+        self.assertEqual(rows[self.scholarship1.id]['bookmark_count'], 2)
+        self.assertTrue(rows[self.scholarship1.id]['is_bookmarked'])
+        self.assertEqual(rows[self.scholarship2.id]['bookmark_count'], 0)
+        self.assertFalse(rows[self.scholarship2.id]['is_bookmarked'])
+
+    def test_anonymous_reads_are_cached_until_scholarship_changes(self):
+        self.scholarship1.donor_id = 7
+        self.scholarship1.save()
+        urls = [
+            '/api/scholarships/',
+            f'/api/scholarships/{self.scholarship1.id}/',
+            '/api/scholarships/donor/7/',
+        ]
+        first = [self.client.get(url).data for url in urls]
+        with self.assertNumQueries(0):
+            second = [self.client.get(url).data for url in urls]
+        self.assertEqual(first, second)
+
+        self.scholarship1.name = 'Renamed'
+        self.scholarship1.save()
+        self.assertEqual(self.client.get(urls[1]).data['name'], 'Renamed')
+        self.assertEqual(self.client.get(urls[2]).data[0]['name'], 'Renamed')
+
+        self.normal_user.saved_scholarships.add(self.scholarship1)
+        self.assertEqual(self.client.get(urls[1]).data['bookmark_count'], 1)
+
+        # Moving the scholarship to another donor clears the old donor's listing too.
+        self.scholarship1.donor_id = 8
+        self.scholarship1.save()
+        self.assertEqual(self.client.get(urls[2]).data, [])
+
+    def test_authenticated_reads_bypass_cache(self):
+        self.client.get('/api/scholarships/')
+        self.scholarship1.bookmarked_by.add(self.normal_user)
+        self.client.force_authenticate(self.normal_user)
+        rows = {row['id']: row for row in self.client.get('/api/scholarships/').data}
+        self.assertTrue(rows[self.scholarship1.id]['is_bookmarked'])
@@ -2,16 +2,26 @@
 from rest_framework import generics, viewsets, permissions, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.db.models import Avg
 from django.shortcuts import get_object_or_404
+from mybackend.db_routers import ReplicaReadMixin
 from .models import Scholarship
 from .serializers import ScholarshipSerializer
+from . import cache as scholarship_cache
 
 # List all scholarships or create a new one (only admins can create)
-class ScholarshipListCreate(generics.ListCreateAPIView):
+class ScholarshipListCreate(ReplicaReadMixin, generics.ListCreateAPIView):
     queryset = Scholarship.objects.all()
     serializer_class = ScholarshipSerializer
 
+    def get_queryset(self):
+        return Scholarship.objects.with_bookmark_info(self.request.user)
+
+    def list(self, request, *args, **kwargs):
+        return scholarship_cache.cached_anonymous_response(
+            request, scholarship_cache.LIST_KEY,
+            lambda: super(ScholarshipListCreate, self).list(request, *args, **kwargs).data,
+        )
+
     def get_permissions(self):
         if self.request.method == "GET":
             return [permissions.AllowAny()]
@@ -29,6 +39,17 @@ class ScholarshipDetailUpdateDelete(generics.RetrieveUpdateDestroyAPIView):
     queryset = Scholarship.objects.all()
     serializer_class = ScholarshipSerializer
 
+    def get_queryset(self):
+        return Scholarship.objects.with_bookmark_info(self.request.user)
+
+    def retrieve(self, request, *args, **kwargs):
+        return scholarship_cache.cached_anonymous_response(
+            request, scholarship_cache.detail_key(kwargs["pk"]),
+            lambda: super(ScholarshipDetailUpdateDelete, self).retrieve(
+                request, *args, **kwargs
+            ).data,
+        )
+
     def get_permissions(self):
         # Allow read-only methods to anyone; require admin for write ops
         if self.request.method in permissions.SAFE_METHODS:
@@ -36,12 +57,18 @@ class ScholarshipDetailUpdateDelete(generics.RetrieveUpdateDestroyAPIView):
         return [permissions.IsAdminUser()]
 
 # Filter scholarships by donor (active scholarships)
-class ScholarshipsByDonorView(APIView):
+class ScholarshipsByDonorView(ReplicaReadMixin, APIView):
     def get(self, request, donor_id):
-        # Filter by numeric donor_id, showing only active scholarships
-        qs = Scholarship.objects.filter(donor_id=donor_id, is_active=True)
-        serializer = ScholarshipSerializer(qs, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        def build():
+            # Filter by numeric donor_id, showing only active scholarships
+            qs = Scholarship.objects.filter(
+                donor_id=donor_id, is_active=True
+            ).with_bookmark_info(request.user)
+            return ScholarshipSerializer(qs, many=True, context={"request": request}).data
+
+        return scholarship_cache.cached_anonymous_response(
+            request, scholarship_cache.donor_key(donor_id), build
+        )
 
 # ViewSet for additional endpoints via DRF router
 class ScholarshipViewSet(viewsets.ModelViewSet):
@@ -49,19 +76,13 @@ class ScholarshipViewSet(viewsets.ModelViewSet):
     serializer_class = ScholarshipSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_queryset(self):
+        return Scholarship.objects.with_bookmark_info(self.request.user)
+
 # Generate a report of scholarships
-class ScholarshipReportView(APIView):
+class ScholarshipReportView(ReplicaReadMixin, APIView):
     def get(self, request):
-        total = Scholarship.objects.count()
-        avg_amount = Scholarship.objects.aggregate(avg=Avg('amount'))['avg']
-        active_count = Scholarship.objects.filter(is_active=True).count()
-        inactive_count = total - active_count
-        report = {
-            "total_scholarships": total,
-            "average_amount": avg_amount,
-            "active_scholarships": active_count,
-            "inactive_scholarships": inactive_count,
-        }
+        report = Scholarship.objects.summary()
         return Response(report, status=status.HTTP_200_OK)
 
 # Endpoint to bookmark (save) a scholarship for the current user
@@ -18,8 +18,23 @@ const UserListPage = () => {
   const router = useRouter();
 
   const fetchUsers = () => {
-    fetch("http://127.0.0.1:8000/api/accounts/users/")
-      .then((res) => res.json())
+    // The user directory is admin-only.
+    const token = localStorage.getItem("authToken");
+    if (!token) {
+      alert("No auth token found. Please log in as admin.");
+      return;
+    }
+    fetch("http://127.0.0.1:8000/api/accounts/users/", {
+      headers: {
+        Authorization: `Bearer ${token}`,
+      },
+    })
+      .then((res) => {
+        if (!res.ok) {
+          throw new Error(`status ${res.status}`);
+        }
+        return res.json();
+      })
       .then((data) => setUsers(data))
       .catch((error) => console.error("Error fetching users:", error));
   };